@@ -5,8 +5,9 @@ Utiliza Pydantic Settings para gerenciar variáveis de ambiente
 com validação de tipos e valores padrão seguros.
 """
 
+import os
 from functools import lru_cache
-from typing import List, Union
+from typing import List, Literal, Union
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -103,9 +104,49 @@ class Settings(BaseSettings):
     use_directml: bool = True
     directml_device_id: int = 0
     
+    # Transcrição (faster-whisper): tiny, base, small...
+    whisper_model: str = "tiny"
+    
+    # Micro-batching do TTS: requisições da mesma referência que chegam
+    # dentro da janela são amostradas juntas (1 = desativado)
+    tts_max_batch_size: int = 4
+    tts_batch_wait_ms: int = 10
+    
+    # torch.compile do transformer F5-TTS e do vocoder (apenas CUDA/ROCm;
+    # compilado no warmup após o carregamento)
+    tts_compile_model: bool = False
+    # reduce-overhead captura CUDA graphs (um por forma de entrada);
+    # max-autotune-no-cudagraphs evita a memória extra dos graphs
+    tts_compile_mode: Literal[
+        "default", "reduce-overhead", "max-autotune", "max-autotune-no-cudagraphs"
+    ] = "reduce-overhead"
+    
+    # Precisão da inferência F5-TTS em CUDA/ROCm ("auto" = bf16 se
+    # suportado, senão fp16). fp16/bf16 explícitos também convertem os
+    # pesos do transformer; o vocoder permanece em fp32
+    tts_precision: Literal["auto", "fp32", "fp16", "bf16"] = "auto"
+    
+    # cudnn.benchmark: escolhe o melhor algoritmo por forma de entrada.
+    # Cada duração nova de áudio é uma forma nova (novo benchmark), então
+    # só compensa com textos de tamanho parecido
+    tts_cudnn_benchmark: bool = False
+    
+    # torch.jit.trace do vocoder quando o F5-TTS roda em CPU (onde o
+    # torch.compile não é usado); o módulo traçado fica em disco
+    tts_trace_vocoder: bool = True
+    
+    # Quantização dinâmica int8 das camadas Linear do DiT em CPU
+    # (o vocoder permanece em fp32)
+    tts_cpu_quantization: bool = True
+    
+    # gc.collect() + empty_cache() ao descarregar o RVC. Desativado, o
+    # allocator do PyTorch mantém os blocos para o próximo carregamento
+    aggressive_memory_release: bool = False
+    
     # Limites de áudio
     max_audio_duration: int = 300  # 5 minutos
     min_audio_duration: int = 3    # 3 segundos
+    max_ref_seconds: int = 20      # Janela máxima lida do áudio de referência
     max_file_size_mb: int = 50     # 50 MB
     
     # Formatos e idiomas suportados
@@ -132,6 +173,11 @@ class Settings(BaseSettings):
     cache_ttl_seconds: int = 3600
     max_concurrent_tasks: int = 3
     
+    # Logs em produção: buffer de stdout (0 = sem buffer) e intervalo
+    # do flush periódico
+    log_buffer_size: int = 65536
+    log_flush_interval_ms: int = 200
+    
     # CORS
     cors_origins: List[str] = ["http://localhost:5173", "http://localhost:3000"]
     
@@ -156,3 +202,22 @@ def get_settings() -> Settings:
         Settings: Configurações da aplicação
     """
     return Settings()
+
+
+@lru_cache(maxsize=1)
+def configure_rocm_env() -> None:
+    """
+    Exporta as variáveis de ambiente ROCm (antes de importar torch).
+    
+    Executa uma única vez por processo, com um único os.environ.update;
+    chamadas seguintes (de outros serviços) não fazem nada.
+    """
+    settings = get_settings()
+    if not settings.use_rocm:
+        return
+    os.environ.update({
+        "HSA_OVERRIDE_GFX_VERSION": settings.hsa_override_gfx_version,
+        "ROCR_VISIBLE_DEVICES": settings.rocm_visible_devices,
+        "HIP_VISIBLE_DEVICES": settings.rocm_visible_devices,
+        "PYTORCH_ROCM_ARCH": settings.pytorch_rocm_arch,
+    })
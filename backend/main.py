@@ -5,6 +5,8 @@ Configura a aplicação, middlewares, routers e eventos
 de ciclo de vida (startup/shutdown).
 """
 
+import os
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
@@ -18,7 +20,8 @@ from slowapi.errors import RateLimitExceeded
 from backend.config import get_settings
 from backend.middleware.rate_limiter import limiter
 from backend.routers import health, payment, user, voice, tasks, webhooks
-from backend.utils.logger import get_logger, setup_logging
+from backend.services.webhook_service import get_webhook_service
+from backend.utils.logger import get_logger, request_id_ctx, setup_logging
 
 # Configurar logging no início
 setup_logging()
@@ -45,7 +48,6 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Iniciando aplicação Voice Cloning SaaS...")
     
     # Criar diretórios necessários
-    import os
     for directory in [settings.upload_dir, settings.models_dir, settings.output_dir]:
         os.makedirs(directory, exist_ok=True)
         logger.info(f"Diretório verificado: {directory}")
@@ -82,7 +84,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # === SHUTDOWN ===
     logger.info("Encerrando aplicação...")
     
-    # Liberar recursos de GPU
+    # Liberar modelos e recursos de GPU
+    await voice.tts_service.hard_unload()
+    await get_webhook_service().aclose()
     try:
         import torch
         if torch.cuda.is_available():
@@ -144,15 +148,12 @@ async def log_requests(request, call_next):
     Middleware para logging de todas as requisições HTTP.
     Adiciona request_id único e loga tempo de resposta.
     """
-    import time
-    import uuid
-    from backend.utils.logger import request_id_ctx
-    
     # Gera request_id único
-    req_id = str(uuid.uuid4())[:8]
-    request_id_ctx.set(req_id)
+    # 4 bytes aleatórios = 8 caracteres hex, sem montar um UUID
+    req_id = os.urandom(4).hex()
+    token = request_id_ctx.set(req_id)
     
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     method = request.method
     path = request.url.path
     
@@ -167,7 +168,6 @@ async def log_requests(request, call_next):
     
     try:
         response = await call_next(request)
-        duration = time.time() - start_time
         
         # Log de resposta (apenas para endpoints não triviais)
         if not path.startswith("/health") and path != "/":
@@ -177,21 +177,24 @@ async def log_requests(request, call_next):
                 method=method,
                 path=path,
                 status_code=response.status_code,
-                duration_ms=round(duration * 1000, 2),
+                duration_ms=(time.perf_counter_ns() - start_time) / 1_000_000,
             )
         
+        response.headers["X-Request-ID"] = req_id
         return response
     except Exception as e:
-        duration = time.time() - start_time
         logger.error(
             "Requisição falhou",
             method=method,
             path=path,
-            duration_ms=round(duration * 1000, 2),
+            duration_ms=(time.perf_counter_ns() - start_time) / 1_000_000,
             error=str(e),
             error_type=type(e).__name__,
         )
         raise
+    finally:
+        # Restaura o contexto: o request_id não vaza além da requisição
+        request_id_ctx.reset(token)
 
 
 # Incluir routers
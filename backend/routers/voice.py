@@ -5,18 +5,21 @@ Fornece endpoints para operações de voice cloning usando F5-TTS e RVC.
 Inclui pipeline híbrido para geração de voz estilizada.
 """
 
+import asyncio
 import time
 import uuid
 import os
+import secrets
 import shutil
 from typing import List
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.config import get_settings
-from backend.models.database import get_db
+from backend.models.database import async_session_maker, get_db
 from backend.models.entities import OperationType, Transaction, User, VoiceProfile
 from backend.models.schemas import (
     AvailableEmotionsResponse,
@@ -44,8 +47,10 @@ from backend.services.cache_service import get_cache_service
 from backend.utils.exceptions import (
     AudioValidationError,
     InsufficientCreditsError,
+    UserNotFoundError,
     VoiceProfileNotFoundError,
 )
+from backend.utils.audio import WAV_HEADER_SIZE
 from backend.utils.logger import get_logger
 from backend.routers.user import get_current_user
 
@@ -107,8 +112,10 @@ async def clone_voice(
     if request.profile_id:
         profile = await _get_profile_or_raise(request.profile_id, user_id, db)
         reference_path = profile.reference_audio_path
+        reference_text = profile.reference_text
     elif request.reference_audio_url:
         reference_path = request.reference_audio_url
+        reference_text = None
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -121,7 +128,8 @@ async def clone_voice(
         text=request.text,
         reference_audio=reference_path,
         language=request.language,
-        speed=request.speed
+        speed=request.speed,
+        reference_text=reference_text
     )
     
     # Calcular custo real baseado na duração
@@ -191,8 +199,10 @@ async def clone_voice_async(
     if request.profile_id:
         profile = await _get_profile_or_raise(request.profile_id, user_id, db)
         reference_path = profile.reference_audio_path
+        reference_text = profile.reference_text
     elif request.reference_audio_url:
         reference_path = request.reference_audio_url
+        reference_text = None
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -229,7 +239,8 @@ async def clone_voice_async(
             text=request.text,
             reference_audio=reference_path,
             language=request.language,
-            speed=request.speed
+            speed=request.speed,
+            reference_text=reference_text
         )
         # Cachear resultado
         await cache_service.cache_audio(
@@ -258,6 +269,114 @@ async def clone_voice_async(
     }
 
 
+@router.post(
+    "/clone-stream",
+    summary="Clonar voz (streaming)",
+    description="Clona voz e transmite o WAV frase a frase, à medida que é sintetizado.",
+    response_class=StreamingResponse
+)
+async def clone_voice_stream(
+    request: VoiceCloneRequest,
+    user_id: int = Query(..., description="ID do usuário"),
+    db: AsyncSession = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Clona voz usando F5-TTS com resposta em streaming.
+    
+    O áudio começa a chegar assim que a primeira frase é sintetizada.
+    O custo estimado é reservado antes do streaming e acertado ao final
+    pela duração efetivamente transmitida, mesmo se o cliente
+    desconectar ou a síntese falhar no meio.
+    
+    Args:
+        request: Dados da requisição de clonagem
+        user_id: ID do usuário fazendo a requisição
+        db: Sessão do banco de dados
+    
+    Returns:
+        StreamingResponse: WAV PCM 16-bit mono
+    """
+    # Verificar usuário e créditos
+    user = await _get_user_or_raise(user_id, db)
+    
+    estimated_duration = len(request.text) / (150 * 5 / 60)
+    estimated_cost = estimated_duration * settings.credits_per_second
+    
+    if user.credits < estimated_cost:
+        raise InsufficientCreditsError(user.credits, estimated_cost)
+    
+    # Resolver referência de áudio
+    if request.profile_id:
+        profile = await _get_profile_or_raise(request.profile_id, user_id, db)
+        reference_path = profile.reference_audio_path
+        reference_text = profile.reference_text
+    elif request.reference_audio_url:
+        reference_path = request.reference_audio_url
+        reference_text = None
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Forneça profile_id ou reference_audio_url"
+        )
+    
+    # Reservar o custo estimado antes de transmitir: desconectar no meio
+    # do streaming não deixa o áudio já enviado sem cobrança
+    reservation = await credits_service.debit_credits(
+        db=db,
+        user_id=user_id,
+        amount=estimated_cost,
+        operation=OperationType.VOICE_CLONE,
+        description=f"Clonagem de voz (streaming, reserva): {len(request.text)} caracteres"
+    )
+    reserved = -reservation.credits_used
+    await db.commit()
+    
+    logger.info(f"Iniciando clonagem em streaming para usuário {user_id}")
+    
+    async def settle(sent: int) -> None:
+        # A sessão da dependency já foi encerrada ao final do streaming
+        duration = max(0, sent - WAV_HEADER_SIZE) / 2 / tts_service.SAMPLE_RATE
+        actual_cost = duration * settings.credits_per_second
+        try:
+            async with async_session_maker() as session:
+                await credits_service.settle_credits(
+                    db=session,
+                    user_id=user_id,
+                    reserved=reserved,
+                    amount=actual_cost,
+                    operation=OperationType.VOICE_CLONE,
+                    description=f"Clonagem de voz (streaming, acerto): {len(request.text)} caracteres"
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Erro ao acertar créditos do streaming (usuário {user_id}): {e}")
+            return
+        
+        logger.info(
+            f"Clonagem em streaming concluída para usuário {user_id}: "
+            f"duração={duration:.2f}s, custo={actual_cost:.2f} créditos"
+        )
+    
+    async def audio_stream():
+        sent = 0
+        try:
+            async for chunk in voice_pipeline.text_to_speech_stream(
+                text=request.text,
+                reference_audio=reference_path,
+                language=request.language,
+                speed=request.speed,
+                reference_text=reference_text
+            ):
+                sent += len(chunk)
+                yield chunk
+        finally:
+            # shield: o acerto conclui mesmo com a resposta cancelada
+            # pela desconexão do cliente
+            await asyncio.shield(settle(sent))
+    
+    return StreamingResponse(audio_stream(), media_type="audio/wav")
+
+
 @router.post(
     "/convert",
     response_model=VoiceConvertResponse,
@@ -631,9 +750,11 @@ async def voice_pipeline_endpoint(
     if request.profile_id:
         profile = await _get_profile_or_raise(request.profile_id, user_id, db)
         reference_path = profile.reference_audio_path
+        reference_text = profile.reference_text
         style_model = request.style_model or profile.reference_audio_path
     elif request.reference_audio_url:
         reference_path = request.reference_audio_url
+        reference_text = None
         style_model = request.style_model
     else:
         raise HTTPException(
@@ -655,7 +776,8 @@ async def voice_pipeline_endpoint(
         language=request.language,
         speed=request.speed,
         pitch_shift=request.pitch_shift,
-        apply_rvc=request.apply_rvc
+        apply_rvc=request.apply_rvc,
+        reference_text=reference_text
     )
     
     # Calcular custo real
@@ -682,7 +804,7 @@ async def voice_pipeline_endpoint(
     
     return VoicePipelineResponse(
         success=True,
-        pipeline_id=result.get("pipeline_id", str(uuid.uuid4())[:8]),
+        pipeline_id=result.get("pipeline_id") or secrets.token_hex(4),
         audio_url=result["audio_url"],
         duration_seconds=result["duration"],
         credits_used=actual_cost,
@@ -780,8 +902,6 @@ async def pipeline_status() -> PipelineStatusResponse:
 
 async def _get_user_or_raise(user_id: int, db: AsyncSession) -> User:
     """Busca usuário ou levanta exceção se não encontrado."""
-    from backend.utils.exceptions import UserNotFoundError
-    
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     
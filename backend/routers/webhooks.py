@@ -142,7 +142,7 @@ async def create_webhook(
         id=webhook.id,
         user_id=webhook.user_id,
         url=webhook.url,
-        events=webhook.events,
+        events=sorted(webhook.events),
         active=webhook.active,
         has_secret=webhook.secret is not None,
         failure_count=webhook.failure_count,
@@ -178,7 +178,7 @@ async def list_webhooks(
                 id=wh.id,
                 user_id=wh.user_id,
                 url=wh.url,
-                events=wh.events,
+                events=sorted(wh.events),
                 active=wh.active,
                 has_secret=wh.secret is not None,
                 failure_count=wh.failure_count,
@@ -254,7 +254,7 @@ async def get_webhook(
         id=webhook.id,
         user_id=webhook.user_id,
         url=webhook.url,
-        events=webhook.events,
+        events=sorted(webhook.events),
         active=webhook.active,
         has_secret=webhook.secret is not None,
         failure_count=webhook.failure_count,
@@ -338,11 +338,11 @@ async def test_webhook(
         )
     
     # Temporariamente adicionar evento de teste se não configurado
-    original_events = webhook.events.copy()
+    original_events = webhook.events
     test_event = "task.completed"
     
     if test_event not in webhook.events:
-        webhook.events.append(test_event)
+        webhook.events = webhook.events | {test_event}
     
     # Enviar evento de teste
     result = await service.send_webhook(
@@ -13,6 +13,7 @@ Uso:
 
 Modelos baixados:
     - F5-TTS Base: Modelo principal de Text-to-Speech (~2GB)
+    - Whisper (CTranslate2): Transcrição do áudio de referência (~75MB no tier tiny)
 """
 
 import os
@@ -35,6 +36,10 @@ except ImportError:
 MODELS_DIR = ROOT_DIR / "models"
 F5_TTS_REPO = "SWivid/F5-TTS"
 
+# Whisper já convertido para CTranslate2 (faster-whisper)
+WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "tiny")
+WHISPER_REPO = f"Systran/faster-whisper-{WHISPER_MODEL}"
+
 # Arquivos para download
 F5_TTS_FILES = [
     "F5TTS_Base/model_1200000.pt",  # Checkpoint principal (~2GB)
@@ -48,6 +53,7 @@ def create_directories():
         MODELS_DIR,
         MODELS_DIR / "f5-tts",
         MODELS_DIR / "f5-tts" / "F5TTS_Base",
+        MODELS_DIR / "whisper",
     ]
     
     for dir_path in dirs:
@@ -96,6 +102,33 @@ def download_f5_tts():
         return False
 
 
+def download_whisper():
+    """
+    Baixa modelo Whisper já convertido para CTranslate2.
+    
+    O modelo será baixado para ./models/whisper/<modelo>-ct2/, caminho
+    carregado diretamente pelo TranscriptionService em todos os workers.
+    """
+    if not HF_HUB_AVAILABLE:
+        print("ERRO: huggingface-hub não disponível")
+        return False
+    
+    output_dir = MODELS_DIR / "whisper" / f"{WHISPER_MODEL}-ct2"
+    print(f"\nBaixando Whisper ({WHISPER_REPO})...")
+    
+    try:
+        snapshot_download(
+            repo_id=WHISPER_REPO,
+            local_dir=output_dir,
+            local_dir_use_symlinks=False
+        )
+        print(f"✓ Whisper salvo em: {output_dir}")
+        return True
+    except Exception as e:
+        print(f"\n✗ Erro ao baixar Whisper: {e}")
+        return False
+
+
 def download_vocos():
     """
     Baixa vocoder Vocos (opcional - baixado automaticamente pelo F5-TTS).
@@ -123,6 +156,13 @@ def verify_installation():
     else:
         print(f"✗ F5-TTS Base não encontrado: {f5_model}")
     
+    # Verificar Whisper
+    whisper_model = MODELS_DIR / "whisper" / f"{WHISPER_MODEL}-ct2" / "model.bin"
+    if whisper_model.exists():
+        print(f"✓ Whisper ({WHISPER_MODEL}): {whisper_model.parent}")
+    else:
+        print(f"✗ Whisper não encontrado: {whisper_model.parent}")
+    
     print()
 
 
@@ -141,9 +181,10 @@ def main():
     print("\n[1/3] Criando diretórios...")
     create_directories()
     
-    # Baixar F5-TTS
-    print("\n[2/3] Baixando F5-TTS...")
+    # Baixar F5-TTS e Whisper
+    print("\n[2/3] Baixando F5-TTS e Whisper...")
     success = download_f5_tts()
+    success = download_whisper() and success
     
     # Verificar instalação
     print("\n[3/3] Verificando instalação...")
@@ -16,6 +16,8 @@ from backend.services.cache_service import AudioCacheService, MemoryCache, get_c
 from backend.services.background_tasks import BackgroundTaskManager, TaskStatus, get_task_manager
 from backend.services.training_service import TrainingService, TrainingStatus, get_training_service
 from backend.services.webhook_service import WebhookService, WebhookEvent, get_webhook_service
+from backend.services.transcription_service import TranscriptionService, get_transcription_service
+from backend.services.gpu_worker import GPU_EXECUTOR, run_on_gpu
 
 __all__ = [
     "AudioProcessor",
@@ -41,4 +43,8 @@ __all__ = [
     "WebhookService",
     "WebhookEvent",
     "get_webhook_service",
+    "TranscriptionService",
+    "get_transcription_service",
+    "GPU_EXECUTOR",
+    "run_on_gpu",
 ]
@@ -8,6 +8,7 @@ reprocessamento de áudios idênticos.
 import asyncio
 import hashlib
 import os
+import shutil
 import time
 from pathlib import Path
 from typing import Any, Dict, Optional
@@ -183,7 +184,6 @@ class AudioCacheService:
         """Limpa todos os caches."""
         self.memory_cache.clear()
         # Limpar cache em disco
-        import shutil
         if self.cache_dir.exists():
             shutil.rmtree(self.cache_dir)
             self.cache_dir.mkdir(parents=True, exist_ok=True)
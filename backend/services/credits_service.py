@@ -209,6 +209,73 @@ class CreditsService:
         
         return transaction
     
+    async def settle_credits(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        reserved: float,
+        amount: float,
+        operation: OperationType,
+        description: Optional[str] = None
+    ) -> Optional[Transaction]:
+        """
+        Acerta uma reserva feita com debit_credits pelo custo real.
+        
+        Devolve a diferença quando o custo real é menor que a reserva
+        e cobra o excedente quando é maior, limitado ao saldo (o serviço
+        já foi entregue, então não há como recusar). Sem consumo nenhum
+        (amount == 0) a reserva é devolvida por inteiro, sem cobrança
+        mínima.
+        
+        Args:
+            db: Sessão do banco de dados
+            user_id: ID do usuário
+            reserved: Valor efetivamente debitado na reserva
+            amount: Custo real da operação
+            operation: Tipo de operação
+            description: Descrição da operação
+        
+        Returns:
+            Transaction do ajuste, ou None se não houver diferença
+        
+        Raises:
+            UserNotFoundError: Se usuário não existe
+        """
+        charge_amount = max(amount, self.min_charge) if amount > 0 else 0.0
+        delta = reserved - charge_amount  # Positivo: devolução
+        if abs(delta) < 1e-9:
+            return None
+        
+        result = await db.execute(
+            select(User).where(User.id == user_id).with_for_update()
+        )
+        user = result.scalar_one_or_none()
+        
+        if not user:
+            raise UserNotFoundError(user_id)
+        
+        # Excedente além do saldo não é cobrado
+        delta = max(delta, -user.credits)
+        user.credits += delta
+        new_balance = user.credits
+        
+        transaction = Transaction(
+            user_id=user_id,
+            operation=operation.value if isinstance(operation, OperationType) else operation,
+            credits_used=delta,
+            balance_after=new_balance,
+            description=description
+        )
+        db.add(transaction)
+        
+        logger.info(
+            f"Reserva de créditos acertada: usuário={user_id}, "
+            f"reservado={reserved:.2f}, custo={charge_amount:.2f}, "
+            f"novo_saldo={new_balance:.2f}"
+        )
+        
+        return transaction
+    
     def estimate_cost(
         self,
         duration_seconds: float,
@@ -0,0 +1,57 @@
+"""
+Worker único compartilhado para trabalho na GPU.
+
+F5-TTS e RVC (ONNX em CUDA/ROCm) disputam a mesma GPU: rodar ambos
+numa única thread persistente evita que chamadas concorrentes briguem
+por memória e mantém o contexto CUDA "quente" numa thread fixa, sem
+competir com o pool padrão usado por asyncio.to_thread.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+# Import condicional de PyTorch
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+    torch = None
+
+T = TypeVar("T")
+
+
+def _init_gpu_thread() -> None:
+    """
+    Prepara a thread do worker para inferência.
+    
+    Autograd desligado de vez nesta thread: o estado é por thread e
+    aqui nada é treinado.
+    """
+    if not TORCH_AVAILABLE:
+        return
+    torch.set_grad_enabled(False)
+
+
+# Thread persistente dona de toda a execução na GPU
+GPU_EXECUTOR = ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix="gpu",
+    initializer=_init_gpu_thread
+)
+
+
+async def run_on_gpu(func: Callable[..., T], *args: Any) -> T:
+    """
+    Executa uma função síncrona no worker da GPU.
+
+    Args:
+        func: Função a executar
+        *args: Argumentos posicionais
+
+    Returns:
+        Resultado de func(*args)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(GPU_EXECUTOR, func, *args)
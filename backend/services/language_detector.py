@@ -5,13 +5,17 @@ Detecta o idioma de textos para uso no pipeline de TTS,
 permitindo seleção automática da voz correta.
 """
 
+from functools import lru_cache
 from typing import Dict, List, Optional
 
 from backend.utils.logger import get_logger
 
 # Import condicional do langdetect
 try:
-    from langdetect import detect, detect_langs, LangDetectException
+    from langdetect import DetectorFactory, detect, detect_langs, LangDetectException
+    # Semente fixa: o langdetect é não-determinístico por padrão, o que
+    # tornaria o cache de detecções inconsistente
+    DetectorFactory.seed = 0
     LANGDETECT_AVAILABLE = True
 except ImportError:
     LANGDETECT_AVAILABLE = False
@@ -19,6 +23,19 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+# Prefixo analisado pelo detector: o idioma de um texto é estável já nos
+# primeiros caracteres, e a chave do cache fica limitada
+_DETECT_PREFIX_CHARS = 256
+
+# Textos mais curtos que isso não têm sinal suficiente para o langdetect
+_MIN_DETECT_CHARS = 10
+
+
+@lru_cache(maxsize=256)
+def _detect_cached(prefix: str) -> str:
+    """Detecta o código ISO 639-1 de um prefixo de texto (com cache LRU)."""
+    return detect(prefix)
+
 
 class LanguageDetector:
     """
@@ -82,9 +99,13 @@ class LanguageDetector:
         if not self.available:
             return self.DEFAULT_LANGUAGE
         
+        prefix = text.strip()[:_DETECT_PREFIX_CHARS]
+        if len(prefix) < _MIN_DETECT_CHARS:
+            return self.DEFAULT_LANGUAGE
+        
         try:
-            # Detectar idioma com langdetect
-            lang_code = detect(text)
+            # Detectar idioma com langdetect (resultados em cache por prefixo)
+            lang_code = _detect_cached(prefix)
             
             # Mapear para código completo
             full_code = self.LANGUAGE_MAP.get(lang_code, self.DEFAULT_LANGUAGE)
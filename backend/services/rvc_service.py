@@ -16,24 +16,27 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import gc
+import json
 import os
+import secrets
 import shutil
+import struct
 import subprocess
-import uuid
+import sys
+import tempfile
+import threading
 import wave
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from backend.services.gpu_worker import run_on_gpu
+from backend.utils.audio import write_silence_wav
 from backend.utils.logger import get_logger
 
 # Configurar variáveis de ambiente ROCm ANTES de importar torch
-from backend.config import get_settings
-_settings = get_settings()
-if _settings.use_rocm:
-    os.environ["HSA_OVERRIDE_GFX_VERSION"] = _settings.hsa_override_gfx_version
-    os.environ["ROCR_VISIBLE_DEVICES"] = _settings.rocm_visible_devices
-    os.environ["HIP_VISIBLE_DEVICES"] = _settings.rocm_visible_devices
-    os.environ["PYTORCH_ROCM_ARCH"] = _settings.pytorch_rocm_arch
+from backend.config import configure_rocm_env, get_settings
+configure_rocm_env()
 
 # Import condicional de PyTorch
 try:
@@ -111,10 +114,314 @@ except ImportError:
     ONNX_AVAILABLE = False
     ort = None
 
+# Import condicional de psutil para contar núcleos físicos
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+    psutil = None
+
+# Import condicional de Numba para kernels numéricos
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    njit = None
+    prange = range
+
 logger = get_logger(__name__)
 settings = get_settings()
 
 
+def _physical_cpu_count() -> int:
+    """Número de núcleos físicos (metade dos lógicos sem psutil, assumindo SMT)."""
+    if PSUTIL_AVAILABLE:
+        count = psutil.cpu_count(logical=False)
+        if count:
+            return count
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+if NUMBA_AVAILABLE:
+    # Só reassoc/contract: fastmath=True inclui ninf/nnan e tornaria
+    # indefinidos os limites iniciais ±inf de fmin/fmax
+    @njit(cache=True, fastmath={"reassoc", "contract"})
+    def _f0_stats(f0):
+        """
+        Estatísticas de F0 em uma única passada (Numba).
+        
+        Acumula contagem, soma, soma dos quadrados, mínimo e máximo
+        dos frames vozeados (f0 > 0) sem alocar máscara.
+        
+        Returns:
+            Tuple (mean, std, min, max, voiced_ratio)
+        """
+        n = f0.shape[0]
+        count = 0
+        total = 0.0
+        total_sq = 0.0
+        fmin = np.inf
+        fmax = -np.inf
+        for i in range(n):
+            v = f0[i]
+            if v > 0:
+                count += 1
+                total += v
+                total_sq += v * v
+                if v < fmin:
+                    fmin = v
+                if v > fmax:
+                    fmax = v
+        if count == 0:
+            return 0.0, 0.0, 0.0, 0.0, 0.0
+        mean = total / count
+        var = total_sq / count - mean * mean
+        std = np.sqrt(var) if var > 0 else 0.0
+        return mean, std, fmin, fmax, count / n
+else:
+    def _f0_stats(f0):
+        """
+        Estatísticas de F0 (fallback NumPy).
+        
+        A máscara de frames vozeados é calculada uma única vez.
+        
+        Returns:
+            Tuple (mean, std, min, max, voiced_ratio)
+        """
+        voiced = f0[f0 > 0]
+        if voiced.size == 0:
+            return 0.0, 0.0, 0.0, 0.0, 0.0
+        return (
+            float(voiced.mean()),
+            float(voiced.std()),
+            float(voiced.min()),
+            float(voiced.max()),
+            voiced.size / f0.size,
+        )
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _f32_to_i16(x, out):
+        """
+        Converte float32 [-1, 1] para int16 em uma única passada (Numba).
+        
+        Funde escala, saturação e cast sem buffer float intermediário.
+        """
+        for i in prange(x.shape[0]):
+            v = x[i] * 32767.0
+            if v > 32767.0:
+                v = 32767.0
+            elif v < -32768.0:
+                v = -32768.0
+            out[i] = np.int16(v)
+        return out
+else:
+    def _f32_to_i16(x, out):
+        """Converte float32 [-1, 1] para int16 com saturação (fallback NumPy)."""
+        scaled = np.multiply(x, 32767.0, dtype=np.float32)
+        np.clip(scaled, -32768.0, 32767.0, out=scaled)
+        out[:] = scaled
+        return out
+
+
+def _read_wav_header(path: str) -> Optional[Tuple[int, int]]:
+    """
+    Lê número de frames e sample rate direto do header RIFF/WAVE.
+    
+    Percorre os chunks até encontrar "fmt " e "data", sem decodificar
+    áudio nem carregar librosa/torchaudio.
+    
+    Args:
+        path: Caminho do arquivo
+    
+    Returns:
+        Tuple (frames, sample_rate) ou None se não for um WAV válido
+    """
+    try:
+        with open(path, "rb") as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+                return None
+            
+            sample_rate = block_align = 0
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+                
+                if chunk_id == b"fmt ":
+                    fmt = f.read(chunk_size)
+                    _, _, sample_rate, _, block_align = struct.unpack("<HHIIH", fmt[:14])
+                    f.seek(chunk_size & 1, os.SEEK_CUR)
+                elif chunk_id == b"data":
+                    if not sample_rate or not block_align:
+                        return None
+                    # Tamanho 0xFFFFFFFF = WAV gravado em streaming
+                    if chunk_size == 0xFFFFFFFF:
+                        chunk_size = os.path.getsize(path) - f.tell()
+                    return chunk_size // block_align, sample_rate
+                else:
+                    # Chunks têm padding para tamanho par
+                    f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
+
+# Resultado da busca pelo conda, persistido entre reinícios do servidor
+_CONDA_CACHE_FILE = Path.home() / ".cache" / "aetherstudio" / "conda.json"
+
+
+# Nomes usuais do diretório de instalação do conda
+_CONDA_DIR_NAMES = ("miniconda3", "anaconda3", "miniforge3", "mambaforge")
+
+
+def _conda_candidates() -> Iterator[Path]:
+    """Gera (sob demanda) os diretórios onde o conda costuma ser instalado."""
+    home = Path.home()
+    bases = [home]
+    if sys.platform == "win32":
+        bases += [
+            Path(os.environ[var])
+            for var in ("LOCALAPPDATA", "ProgramData")
+            if os.environ.get(var)
+        ]
+    for base in bases:
+        for name in _CONDA_DIR_NAMES:
+            yield base / name
+
+
+def _probe_conda() -> Optional[str]:
+    """Procura o executável do conda em $CONDA_EXE, nas instalações usuais e no PATH."""
+    conda_exe = os.environ.get("CONDA_EXE")
+    if conda_exe and Path(conda_exe).is_file():
+        return conda_exe
+    
+    # O executável real vem primeiro: no Windows, condabin\conda.bat
+    # passaria os argumentos (caminhos de modelo) pelo parser do cmd
+    # quando chamado sem shell. Para no primeiro encontrado
+    if sys.platform == "win32":
+        names = ("Scripts/conda.exe", "condabin/conda.bat")
+    else:
+        names = ("bin/conda", "condabin/conda")
+    for location in _conda_candidates():
+        for name in names:
+            candidate = location / name
+            if candidate.is_file():
+                return str(candidate)
+    
+    # Busca no PATH em processo (respeita PATHEXT no Windows), sem
+    # subprocesso `where`/`which`
+    return shutil.which("conda")
+
+
+@lru_cache(maxsize=1)
+def get_conda_executable() -> str:
+    """
+    Retorna o executável do conda usado para o RVC WebUI.
+    
+    O resultado da busca fica em _CONDA_CACHE_FILE (chaveado por HOME e
+    plataforma) e é reaproveitado enquanto o executável existir, para
+    que reinícios não repitam as sondagens no disco. Sem resultado,
+    usa "conda" como último recurso.
+    
+    Returns:
+        str: Caminho do executável ou "conda"
+    """
+    # "probe" invalida caches gravados por versões anteriores da busca
+    key = {"home": str(Path.home()), "platform": sys.platform, "probe": 2}
+    try:
+        cached = json.loads(_CONDA_CACHE_FILE.read_text(encoding="utf-8"))
+        if all(cached.get(k) == v for k, v in key.items()) and Path(cached["conda_exe"]).is_file():
+            return cached["conda_exe"]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    
+    conda_exe = _probe_conda()
+    if conda_exe is None:
+        return "conda"
+    
+    try:
+        _CONDA_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _CONDA_CACHE_FILE.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({**key, "conda_exe": conda_exe}), encoding="utf-8")
+        os.replace(tmp_path, _CONDA_CACHE_FILE)
+    except OSError as e:
+        logger.debug(f"Não foi possível gravar o cache do conda: {e}")
+    
+    return conda_exe
+
+
+def _conda_env_prefix(env_name: str) -> Optional[Path]:
+    """
+    Diretório do ambiente conda `env_name`, se encontrado.
+    
+    Procura em $CONDA_PREFIX (ambiente ativo) e em <raiz do conda>/envs.
+    """
+    active = os.environ.get("CONDA_PREFIX")
+    if active and Path(active).name == env_name:
+        return Path(active)
+    
+    conda_exe = get_conda_executable()
+    if conda_exe == "conda":
+        return None
+    # <raiz>/bin/conda, <raiz>/condabin/conda(.bat), <raiz>/Scripts/conda.exe
+    prefix = Path(conda_exe).parent.parent / "envs" / env_name
+    return prefix if prefix.is_dir() else None
+
+
+# Ambientes conda já localizados: nome -> (python, diretórios do PATH,
+# prefixo). Só resultados positivos: um ambiente criado depois do
+# primeiro uso ainda é encontrado na chamada seguinte
+_CONDA_ENVS: Dict[str, Tuple[str, str, str]] = {}
+
+
+def _conda_env_command(env_name: str) -> Tuple[Tuple[str, ...], Optional[Dict[str, str]]]:
+    """
+    Comando (e ambiente) para rodar o Python de um ambiente conda.
+    
+    Chama o interpretador do ambiente diretamente, com o PATH que o
+    `conda activate` montaria, evitando o custo de 1-3s de ativação do
+    `conda run` a cada subprocesso. Sem o diretório do ambiente, recorre
+    ao `conda run`.
+    
+    Só a localização do ambiente é memorizada; o dict de ambiente é
+    montado a cada chamada sobre o os.environ atual e pertence a quem
+    chamou. os.environ do servidor não é alterado.
+    
+    Returns:
+        Tuple (prefixo do comando, variáveis de ambiente ou None)
+    """
+    found = _CONDA_ENVS.get(env_name)
+    if found is None:
+        prefix = _conda_env_prefix(env_name)
+        if sys.platform == "win32":
+            python = prefix / "python.exe" if prefix else None
+            bin_dirs = ("", "Library/mingw-w64/bin", "Library/usr/bin", "Library/bin", "Scripts", "bin")
+        else:
+            python = prefix / "bin" / "python" if prefix else None
+            bin_dirs = ("bin",)
+        
+        if python is None or not python.is_file():
+            return (get_conda_executable(), "run", "-n", env_name, "python"), None
+        
+        found = _CONDA_ENVS[env_name] = (
+            str(python),
+            os.pathsep.join(str(prefix / d) for d in bin_dirs),
+            str(prefix),
+        )
+    
+    python, path_dirs, prefix = found
+    env = dict(os.environ)
+    env["PATH"] = os.pathsep.join([path_dirs, env.get("PATH", "")])
+    env["CONDA_PREFIX"] = prefix
+    env["CONDA_DEFAULT_ENV"] = env_name
+    return (python,), env
+
+
 class RVCService:
     """
     Serviço de conversão de voz usando RVC.
@@ -161,8 +468,21 @@ class RVCService:
         self._rvc_model_path = None
         self._rvc_index_path = None
         
+        # Diretório de saída resolvido e criado uma única vez
+        self._output_dir = Path(settings.output_dir)
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # IO binding ONNX com buffers reutilizados entre chamadas
+        self._io_binding = None
+        self._io_output_name = None
+        self._io_lock = threading.Lock()
+        self._onnx_on_gpu = False
+        self._audio_buf = None
+        self._f0_buf = None
+        
         # Determinar método de extração de pitch disponível
-        self._pitch_method = self._detect_pitch_method()
+        self._pitch_chain = self._build_pitch_chain()
+        self._pitch_method = self._pitch_chain[0][0] if self._pitch_chain else "none"
         
         logger.info(
             f"RVCService inicializado "
@@ -213,16 +533,21 @@ class RVCService:
         
         return "cpu"
     
-    def _detect_pitch_method(self) -> str:
-        """Detecta método de extração de pitch disponível."""
+    def _build_pitch_chain(self) -> List[Tuple[str, Any]]:
+        """
+        Monta a cadeia de extratores de pitch disponíveis (uma vez).
+        
+        Ordem: pyworld DIO (10-20x mais rápido que CREPE em CPU),
+        CREPE e parselmouth.
+        """
+        chain = []
+        if PYWORLD_AVAILABLE:
+            chain.append(("dio", self._pitch_dio))
         if CREPE_AVAILABLE and TORCH_AVAILABLE:
-            return "crepe"
-        elif PYWORLD_AVAILABLE:
-            return "harvest"  # pyworld harvest
-        elif PARSELMOUTH_AVAILABLE:
-            return "parselmouth"
-        else:
-            return "none"
+            chain.append(("crepe", self._pitch_crepe))
+        if PARSELMOUTH_AVAILABLE:
+            chain.append(("parselmouth", self._pitch_parselmouth))
+        return chain
 
     @contextlib.contextmanager
     def _temp_cwd(self, path: Path):
@@ -337,8 +662,14 @@ class RVCService:
                 
                 self.model = ort.InferenceSession(
                     str(onnx_path),
+                    sess_options=self._build_session_options(
+                        cpu_only=providers[0] == 'CPUExecutionProvider'
+                    ),
                     providers=providers
                 )
+                self._io_binding = self.model.io_binding()
+                self._io_output_name = self.model.get_outputs()[0].name
+                self._onnx_on_gpu = providers[0] != 'CPUExecutionProvider'
                 logger.info(f"Modelo ONNX carregado: {onnx_path}")
                 return
             except Exception as e:
@@ -372,12 +703,45 @@ class RVCService:
         
         logger.info("RVC inicializado (modo mock - modelos não encontrados)")
     
+    def _build_session_options(self, cpu_only: bool) -> Any:
+        """
+        Cria SessionOptions do ONNX Runtime.
+        
+        Habilita todas as fusões de grafo e execução sequencial (o grafo
+        do RVC é sequencial, inter-op não ajuda). O ajuste de threads
+        (um por núcleo físico, com spinning) só vale quando a sessão roda
+        apenas em CPU; com CUDA/ROCm os threads intra-op ficam ociosos
+        e o spinning só queimaria CPU.
+        """
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        sess_options.inter_op_num_threads = 1
+        if cpu_only:
+            sess_options.intra_op_num_threads = _physical_cpu_count()
+            sess_options.add_session_config_entry("session.intra_op.allow_spinning", "1")
+        else:
+            sess_options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        return sess_options
+    
     async def unload_model(self) -> None:
-        """Descarrega modelo da memória."""
+        """
+        Descarrega modelo da memória.
+        
+        Apenas solta as referências; gc.collect() e empty_cache() só rodam
+        com settings.aggressive_memory_release, mantendo o allocator
+        "quente" para o próximo carregamento.
+        """
         if self.model is not None:
             del self.model
             self.model = None
         
+        self._io_binding = None
+        self._io_output_name = None
+        self._onnx_on_gpu = False
+        self._audio_buf = None
+        self._f0_buf = None
+        
         if self.index is not None:
             del self.index
             self.index = None
@@ -389,12 +753,19 @@ class RVCService:
         self._rvc_model_path = None
         self._rvc_index_path = None
         
-        # Forçar garbage collection
-        gc.collect()
-        
-        # Liberar memória GPU
         if TORCH_AVAILABLE and torch.cuda.is_available():
-            torch.cuda.empty_cache()
+            if settings.aggressive_memory_release:
+                # Ciclo completo do GC e devolução dos blocos ao driver;
+                # o próximo load volta a pagar os cudaMalloc
+                gc.collect()
+                torch.cuda.empty_cache()
+            logger.debug(
+                "Memória CUDA após unload do RVC",
+                allocated_mb=round(torch.cuda.memory_allocated() / 2**20, 1),
+                reserved_mb=round(torch.cuda.memory_reserved() / 2**20, 1),
+            )
+        elif settings.aggressive_memory_release:
+            gc.collect()
         
         self.is_loaded = False
         logger.info("Modelo RVC descarregado")
@@ -469,19 +840,12 @@ class RVCService:
                 )
         
         try:
-            # Executar conversão em thread separada
-            result = await asyncio.to_thread(
-                self._convert_sync,
-                input_audio_path,
-                voice_model,
-                pitch_shift,
-                filter_radius,
-                index_rate,
-                protect,
-                rms_mix_rate
-            )
+            # 1. Carregar áudio
+            audio, sr = await asyncio.to_thread(self._load_audio, input_audio_path)
             
-            return result
+            return await self._convert_array(
+                audio, sr, pitch_shift, filter_radius, index_rate, protect, rms_mix_rate
+            )
             
         except Exception as e:
             logger.error(f"Erro na conversão RVC: {e}")
@@ -490,10 +854,156 @@ class RVCService:
                 input_audio_path, pitch_shift, voice_model
             )
     
-    def _convert_sync(
+    async def convert_audio(
         self,
-        input_audio_path: str,
+        audio: Any,
+        sample_rate: int,
+        voice_model: str,
+        pitch_shift: int = 0,
+        filter_radius: int = 3,
+        index_rate: float = 0.75,
+        protect: float = 0.33,
+        rms_mix_rate: float = 0.25
+    ) -> Dict[str, Any]:
+        """
+        Converte voz de um áudio em memória (ex: saída do F5-TTS).
+        
+        Evita gravar e reler um WAV intermediário quando a conversão roda
+        no próprio processo (ONNX). O RVC WebUI (subprocesso) e o modo
+        mock precisam de arquivo: nesses casos o áudio é gravado uma vez
+        e segue pelo convert().
+        
+        Args:
+            audio: Áudio float32 mono
+            sample_rate: Taxa de amostragem do áudio
+            voice_model: Modelo de voz alvo
+            pitch_shift: Semitons para ajustar (-12 a +12)
+            filter_radius: Raio do filtro mediano para F0
+            index_rate: Taxa de uso do índice FAISS (0-1)
+            protect: Proteção de consoantes sem voz (0-0.5)
+            rms_mix_rate: Taxa de mixagem RMS (0-1)
+        
+        Returns:
+            Dict no mesmo formato de convert()
+        """
+        if not self.is_loaded:
+            await self.load_model()
+        
+        if self.model is not None and not (self._rvc_repo_dir and self._rvc_model_path):
+            try:
+                return await self._convert_array(
+                    audio,
+                    sample_rate,
+                    pitch_shift,
+                    filter_radius,
+                    index_rate,
+                    protect,
+                    rms_mix_rate
+                )
+            except Exception as e:
+                logger.error(f"Erro na conversão RVC em memória: {e}")
+        
+        # Caminho via arquivo (subprocesso, mock ou falha acima). O WAV
+        # temporário fica fora de output_dir, que é servido em /outputs
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+            input_path = Path(tmp.name)
+        try:
+            await asyncio.to_thread(self._save_audio, audio, sample_rate, str(input_path))
+            return await self.convert(
+                input_audio_path=str(input_path),
+                voice_model=voice_model,
+                pitch_shift=pitch_shift,
+                filter_radius=filter_radius,
+                index_rate=index_rate,
+                protect=protect,
+                rms_mix_rate=rms_mix_rate
+            )
+        finally:
+            input_path.unlink(missing_ok=True)
+    
+    async def convert_batch(
+        self,
+        audios: List[Any],
+        sample_rate: int,
         voice_model: str,
+        pitch_shifts: List[int],
+        filter_radius: int = 3,
+        index_rate: float = 0.75,
+        protect: float = 0.33,
+        rms_mix_rate: float = 0.25
+    ) -> List[Dict[str, Any]]:
+        """
+        Converte vários áudios em memória para o mesmo modelo de voz.
+        
+        No caminho em processo (ONNX), todos os itens vão em uma única
+        chamada ao worker e a inferência roda em lote, cada item com seu
+        próprio pitch shift. Nos demais casos, converte item a item via
+        convert_audio().
+        
+        Args:
+            audios: Áudios float32 mono
+            sample_rate: Taxa de amostragem comum aos áudios
+            voice_model: Modelo de voz alvo
+            pitch_shifts: Semitons por áudio (mesma ordem de audios)
+            filter_radius: Raio do filtro mediano para F0
+            index_rate: Taxa de uso do índice FAISS (0-1)
+            protect: Proteção de consoantes sem voz (0-0.5)
+            rms_mix_rate: Taxa de mixagem RMS (0-1)
+        
+        Returns:
+            List[Dict]: Resultados no formato de convert(), na ordem de entrada
+        """
+        if not self.is_loaded:
+            await self.load_model()
+        
+        if self.model is not None and not (self._rvc_repo_dir and self._rvc_model_path):
+            try:
+                return await self._convert_batch(
+                    audios,
+                    sample_rate,
+                    pitch_shifts,
+                    filter_radius,
+                    index_rate,
+                    protect,
+                    rms_mix_rate
+                )
+            except Exception as e:
+                logger.error(f"Erro na conversão RVC em lote: {e}")
+        
+        return list(await asyncio.gather(*(
+            self.convert_audio(
+                audio,
+                sample_rate,
+                voice_model=voice_model,
+                pitch_shift=shift,
+                filter_radius=filter_radius,
+                index_rate=index_rate,
+                protect=protect,
+                rms_mix_rate=rms_mix_rate
+            )
+            for audio, shift in zip(audios, pitch_shifts)
+        )))
+    
+    async def _run_model(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Executa só o forward do modelo ONNX no executor adequado.
+        
+        Em GPU, o forward vai para o worker compartilhado com o F5-TTS;
+        em CPU, para o pool padrão (sem fila atrás de sínteses). O pré e
+        o pós-processamento (reamostragem, F0, RMS, gravação do WAV) são
+        CPU e rodam fora do worker, sem segurar a GPU.
+        """
+        run = run_on_gpu if self._onnx_on_gpu else asyncio.to_thread
+        return await run(func, *args)
+    
+    def _has_onnx_model(self) -> bool:
+        """Indica se há sessão ONNX carregada para a inferência."""
+        return ONNX_AVAILABLE and self.model is not None and hasattr(self.model, 'run')
+    
+    async def _convert_array(
+        self,
+        audio: Any,
+        sr: int,
         pitch_shift: int,
         filter_radius: int,
         index_rate: float,
@@ -501,15 +1011,87 @@ class RVCService:
         rms_mix_rate: float
     ) -> Dict[str, Any]:
         """
-        Conversão síncrona (executada em thread pool).
+        Conversão de áudio já em memória (float32 mono).
         
-        Implementa o pipeline completo de conversão RVC.
+        Reamostra para SAMPLE_RATE se necessário e executa as etapas
+        2-6 do pipeline de conversão; só a etapa 4 (modelo) passa pelo
+        worker da GPU.
         """
-        # 1. Carregar áudio
-        audio, sr = self._load_audio(input_audio_path)
-        duration = len(audio) / sr
+        audio, f0 = await asyncio.to_thread(self._prepare_array, audio, sr, pitch_shift)
         
-        logger.debug(f"Áudio carregado: {duration:.2f}s, {sr}Hz")
+        # 4. Executar conversão
+        converted_audio = None
+        if self._has_onnx_model():
+            try:
+                converted_audio = await self._run_model(self._run_onnx, audio, f0)
+            except Exception as e:
+                logger.warning(f"Inferência ONNX falhou: {e}")
+        if converted_audio is None:
+            converted_audio = self._apply_conversion(
+                audio, f0, self.SAMPLE_RATE, index_rate, protect
+            )
+        
+        return await asyncio.to_thread(
+            self._finish_array, converted_audio, audio, pitch_shift, rms_mix_rate
+        )
+    
+    async def _convert_batch(
+        self,
+        audios: List[Any],
+        sr: int,
+        pitch_shifts: List[int],
+        filter_radius: int,
+        index_rate: float,
+        protect: float,
+        rms_mix_rate: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Conversão de vários áudios em memória.
+        
+        F0 e pitch shift são calculados por item no pool padrão; a
+        inferência ONNX roda em lote via _run_onnx_batch (um forward
+        por grupo de duração em vez de um por item).
+        """
+        prepared = await asyncio.gather(*(
+            asyncio.to_thread(self._prepare_array, audio, sr, shift)
+            for audio, shift in zip(audios, pitch_shifts)
+        ))
+        inputs = [audio for audio, _ in prepared]
+        f0s = [f0 for _, f0 in prepared]
+        
+        converted = None
+        if self._has_onnx_model():
+            try:
+                converted = await self._run_model(self._run_onnx_batch, inputs, f0s)
+            except Exception as e:
+                logger.warning(f"Inferência ONNX em lote falhou: {e}")
+        if converted is None:
+            converted = [
+                self._apply_conversion(audio, f0, self.SAMPLE_RATE, index_rate, protect)
+                for audio, f0 in prepared
+            ]
+        
+        return list(await asyncio.gather(*(
+            asyncio.to_thread(self._finish_array, out, audio, shift, rms_mix_rate)
+            for out, audio, shift in zip(converted, inputs, pitch_shifts)
+        )))
+    
+    def _prepare_array(self, audio: Any, sr: int, pitch_shift: int) -> Tuple[Any, Any]:
+        """
+        Etapas 1-3 da conversão: reamostragem, extração de F0 e pitch shift.
+        
+        Returns:
+            Tuple (áudio em SAMPLE_RATE, contorno de F0 ajustado)
+        """
+        if sr != self.SAMPLE_RATE:
+            if LIBROSA_AVAILABLE:
+                audio = librosa.resample(audio, orig_sr=sr, target_sr=self.SAMPLE_RATE)
+            else:
+                audio = resample(audio, int(len(audio) * self.SAMPLE_RATE / sr))
+            audio = audio.astype(np.float32, copy=False)
+            sr = self.SAMPLE_RATE
+        
+        logger.debug(f"Áudio carregado: {len(audio) / sr:.2f}s, {sr}Hz")
         
         # 2. Extrair F0 (pitch)
         f0 = self._extract_pitch(audio, sr)
@@ -519,12 +1101,23 @@ class RVCService:
             f0 = self._shift_pitch(f0, pitch_shift)
             logger.debug(f"Pitch shift aplicado: {pitch_shift} semitons")
         
-        # 4. Executar conversão
-        # Nota: Implementação completa requer modelo RVC real
-        # Aqui fazemos processamento básico como demonstração
-        converted_audio = self._apply_conversion(
-            audio, f0, sr, index_rate, protect
-        )
+        return audio, f0
+    
+    def _finish_array(
+        self,
+        converted_audio: Any,
+        audio: Any,
+        pitch_shift: int,
+        rms_mix_rate: float
+    ) -> Dict[str, Any]:
+        """
+        Etapas 5-6 da conversão: pós-processamento e gravação do WAV.
+        
+        Returns:
+            Dict no mesmo formato de convert()
+        """
+        sr = self.SAMPLE_RATE
+        duration = len(audio) / sr
         
         # 5. Pós-processamento
         converted_audio = self._post_process(
@@ -532,10 +1125,8 @@ class RVCService:
         )
         
         # 6. Salvar áudio
-        file_id = str(uuid.uuid4())
-        output_dir = Path(settings.output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{file_id}_converted.wav"
+        file_id = secrets.token_hex(16)
+        output_path = self._output_dir / f"{file_id}_converted.wav"
         
         self._save_audio(converted_audio, sr, str(output_path))
         
@@ -558,20 +1149,15 @@ class RVCService:
         rms_mix_rate: float
     ) -> Dict[str, Any]:
         """Conversão real usando RVC WebUI via subprocesso."""
-        file_id = str(uuid.uuid4())
-        output_dir = Path(settings.output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{file_id}_converted.wav"
+        file_id = secrets.token_hex(16)
+        output_path = self._output_dir / f"{file_id}_converted.wav"
 
         script_path = Path(__file__).resolve().parent.parent / "scripts" / "rvc_inference_runner.py"
 
         # Construir comando base
+        python_cmd, env = _conda_env_command(self._rvc_env_name)
         cmd = [
-            "conda",
-            "run",
-            "-n",
-            self._rvc_env_name,
-            "python",
+            *python_cmd,
             str(script_path),
             "--repo-dir",
             str(self._rvc_repo_dir),
@@ -607,7 +1193,8 @@ class RVCService:
             cmd,
             capture_output=True,
             text=True,
-            check=False
+            check=False,
+            env=env
         )
 
         if result.returncode != 0:
@@ -619,7 +1206,13 @@ class RVCService:
         duration = 0.0
         sample_rate = self.SAMPLE_RATE
 
-        if TORCH_AVAILABLE:
+        # O RVC WebUI sempre grava WAV: header RIFF basta
+        header = _read_wav_header(str(output_path))
+        if header is not None:
+            duration = header[0] / header[1]
+            sample_rate = header[1]
+
+        if duration == 0.0 and TORCH_AVAILABLE:
             try:
                 info = torchaudio.info(str(output_path))
                 duration = info.num_frames / info.sample_rate
@@ -719,7 +1312,9 @@ class RVCService:
         """
         Extrai contorno de pitch (F0) do áudio.
         
-        Usa CREPE se disponível, fallback para pyworld ou parselmouth.
+        Percorre a cadeia de extratores montada no __init__
+        (pyworld DIO > CREPE > parselmouth), parando no primeiro
+        que funcionar.
         
         Args:
             audio: Array de áudio
@@ -731,87 +1326,77 @@ class RVCService:
         # Número de frames esperado
         hop_ms = self.HOP_LENGTH / sr * 1000
         
-        # 1. Tentar CREPE (mais preciso para voz)
-        if CREPE_AVAILABLE and TORCH_AVAILABLE:
+        for name, extractor in self._pitch_chain:
             try:
-                # Converter para tensor
-                audio_tensor = torch.from_numpy(audio).unsqueeze(0)
-                
-                # Garantir sample rate correto para CREPE
-                if sr != 16000:
-                    audio_tensor = torchaudio.functional.resample(
-                        audio_tensor, sr, 16000
-                    )
-                
-                # Extrair pitch
-                time, frequency, confidence, activation = torchcrepe.predict(
-                    audio_tensor,
-                    16000,
-                    hop_length=self.HOP_LENGTH,
-                    fmin=self.F0_MIN,
-                    fmax=self.F0_MAX,
-                    model='tiny',  # Usar modelo menor para velocidade
-                    batch_size=512,
-                    device=self.device
-                )
-                
-                # Filtrar por confiança
-                f0 = frequency.squeeze().numpy()
-                conf = confidence.squeeze().numpy()
-                f0[conf < 0.5] = 0  # Zerar frames com baixa confiança
-                
-                logger.debug(f"F0 extraído com CREPE: {len(f0)} frames")
+                f0 = extractor(audio, sr, hop_ms)
+                logger.debug(f"F0 extraído com {name}: {len(f0)} frames")
                 return f0
-                
-            except Exception as e:
-                logger.warning(f"CREPE falhou: {e}")
-        
-        # 2. Fallback para pyworld (HARVEST)
-        if PYWORLD_AVAILABLE:
-            try:
-                # Converter para float64 (requerido por pyworld)
-                audio_f64 = audio.astype(np.float64)
-                
-                # Extrair F0 com HARVEST (mais preciso que DIO)
-                f0, t = pw.harvest(
-                    audio_f64,
-                    sr,
-                    f0_floor=self.F0_MIN,
-                    f0_ceil=self.F0_MAX,
-                    frame_period=hop_ms
-                )
-                
-                # Refinar com StoneMask
-                f0 = pw.stonemask(audio_f64, f0, t, sr)
-                
-                logger.debug(f"F0 extraído com pyworld: {len(f0)} frames")
-                return f0.astype(np.float32)
-                
-            except Exception as e:
-                logger.warning(f"pyworld falhou: {e}")
-        
-        # 3. Fallback para parselmouth (Praat)
-        if PARSELMOUTH_AVAILABLE:
-            try:
-                sound = parselmouth.Sound(audio, sampling_frequency=sr)
-                pitch = sound.to_pitch_ac(
-                    time_step=hop_ms / 1000,
-                    pitch_floor=self.F0_MIN,
-                    pitch_ceiling=self.F0_MAX
-                )
-                
-                f0 = pitch.selected_array['frequency']
-                logger.debug(f"F0 extraído com parselmouth: {len(f0)} frames")
-                return f0.astype(np.float32)
-                
             except Exception as e:
-                logger.warning(f"parselmouth falhou: {e}")
+                logger.warning(f"{name} falhou: {e}")
         
-        # 4. Fallback final: F0 zerado (sem pitch)
+        # Fallback final: F0 zerado (sem pitch)
         logger.warning("Nenhum extrator de pitch disponível, usando F0 zerado")
         num_frames = int(len(audio) / self.HOP_LENGTH) + 1
         return np.zeros(num_frames, dtype=np.float32)
     
+    def _pitch_dio(self, audio: Any, sr: int, hop_ms: float) -> Any:
+        """F0 com pyworld DIO refinado por StoneMask (rápido, CPU)."""
+        # Converter para float64 (requerido por pyworld)
+        audio_f64 = audio.astype(np.float64)
+        
+        f0, t = pw.dio(
+            audio_f64,
+            sr,
+            f0_floor=self.F0_MIN,
+            f0_ceil=self.F0_MAX,
+            frame_period=hop_ms
+        )
+        
+        # Refinar com StoneMask
+        f0 = pw.stonemask(audio_f64, f0, t, sr)
+        return f0.astype(np.float32)
+    
+    def _pitch_crepe(self, audio: Any, sr: int, hop_ms: float) -> Any:
+        """F0 com CREPE (preciso, porém pesado sem GPU)."""
+        # Converter para tensor
+        audio_tensor = torch.from_numpy(audio).unsqueeze(0)
+        
+        # Garantir sample rate correto para CREPE
+        if sr != 16000:
+            audio_tensor = torchaudio.functional.resample(
+                audio_tensor, sr, 16000
+            )
+        
+        # Extrair pitch
+        time, frequency, confidence, activation = torchcrepe.predict(
+            audio_tensor,
+            16000,
+            hop_length=self.HOP_LENGTH,
+            fmin=self.F0_MIN,
+            fmax=self.F0_MAX,
+            model='tiny',  # Usar modelo menor para velocidade
+            batch_size=512,
+            device=self.device
+        )
+        
+        # Filtrar por confiança
+        f0 = frequency.squeeze().numpy()
+        conf = confidence.squeeze().numpy()
+        f0[conf < 0.5] = 0  # Zerar frames com baixa confiança
+        return f0
+    
+    def _pitch_parselmouth(self, audio: Any, sr: int, hop_ms: float) -> Any:
+        """F0 com parselmouth (Praat, autocorrelação)."""
+        sound = parselmouth.Sound(audio, sampling_frequency=sr)
+        pitch = sound.to_pitch_ac(
+            time_step=hop_ms / 1000,
+            pitch_floor=self.F0_MIN,
+            pitch_ceiling=self.F0_MAX
+        )
+        
+        f0 = pitch.selected_array['frequency']
+        return f0.astype(np.float32)
+    
     def _shift_pitch(self, f0: Any, semitones: int) -> Any:
         """
         Aplica shift de pitch em semitons.
@@ -847,10 +1432,11 @@ class RVCService:
         protect: float
     ) -> Any:
         """
-        Aplica conversão de voz.
+        Aplica conversão de voz sem o modelo ONNX.
         
         Nota: Implementação completa requer modelo RVC treinado.
-        Esta versão aplica processamento básico de pitch.
+        Esta versão aplica processamento básico de pitch; a inferência
+        ONNX é feita antes, via _run_model.
         
         Args:
             audio: Áudio de entrada
@@ -862,22 +1448,6 @@ class RVCService:
         Returns:
             np.ndarray: Áudio convertido
         """
-        # Se temos modelo ONNX, usar inferência
-        if ONNX_AVAILABLE and self.model is not None and hasattr(self.model, 'run'):
-            try:
-                # Preparar inputs para ONNX
-                # Nota: formato exato depende do modelo específico
-                inputs = {
-                    "audio": audio.reshape(1, -1).astype(np.float32),
-                    "f0": f0.reshape(1, -1).astype(np.float32)
-                }
-                
-                # Executar inferência
-                outputs = self.model.run(None, inputs)
-                return outputs[0].squeeze()
-            except Exception as e:
-                logger.warning(f"Inferência ONNX falhou: {e}")
-        
         # Processamento básico sem modelo completo
         # Aplicar pitch shifting usando phase vocoder simplificado
         if LIBROSA_AVAILABLE and f0.sum() > 0:
@@ -887,13 +1457,99 @@ class RVCService:
                 if len(voiced_f0) > 0:
                     # Aplicar time stretch e pitch shift básico
                     # Nota: isso é uma aproximação, não conversão RVC real
-                    converted = audio.copy()
-                    return converted
+                    return audio
             except Exception as e:
                 logger.warning(f"Processamento de pitch falhou: {e}")
         
-        # Fallback: retornar áudio original
-        return audio.copy()
+        # Fallback: retornar áudio original (sem cópia; ver _post_process)
+        return audio
+    
+    def _run_onnx(self, audio: Any, f0: Any) -> Any:
+        """
+        Executa o modelo ONNX via IO binding.
+        
+        Os inputs são copiados para buffers float32 pré-alocados (que só
+        crescem) e vinculados diretamente, evitando alocar e converter
+        arrays a cada chamada.
+        
+        Args:
+            audio: Áudio de entrada
+            f0: Contorno de F0
+        
+        Returns:
+            np.ndarray: Saída do modelo
+        """
+        n_audio = audio.shape[-1]
+        n_f0 = f0.shape[-1]
+        
+        # Nota: formato exato dos inputs depende do modelo específico
+        with self._io_lock:
+            if self._audio_buf is None or self._audio_buf.shape[0] < n_audio:
+                self._audio_buf = np.empty(n_audio, dtype=np.float32)
+            if self._f0_buf is None or self._f0_buf.shape[0] < n_f0:
+                self._f0_buf = np.empty(n_f0, dtype=np.float32)
+            
+            audio_in = self._audio_buf[:n_audio]
+            f0_in = self._f0_buf[:n_f0]
+            audio_in[:] = audio.reshape(-1)
+            f0_in[:] = f0.reshape(-1)
+            
+            binding = self._io_binding
+            binding.bind_cpu_input("audio", audio_in.reshape(1, n_audio))
+            binding.bind_cpu_input("f0", f0_in.reshape(1, n_f0))
+            binding.bind_output(self._io_output_name)
+            
+            self.model.run_with_iobinding(binding)
+            return binding.copy_outputs_to_cpu()[0].squeeze()
+    
+    def _run_onnx_batch(self, audios: List[Any], f0s: List[Any]) -> List[Any]:
+        """
+        Executa o modelo ONNX em lote, agrupando áudios por duração.
+        
+        Áudios com duração parecida (mesmo segundo) são empilhados com
+        zero-padding em um único tensor (B, T), amortizando o overhead
+        de dispatch do ONNX Runtime. Requer eixo de batch dinâmico no
+        modelo exportado; caso contrário, processa um a um.
+        
+        Args:
+            audios: Lista de áudios (1D)
+            f0s: Lista de contornos de F0 correspondentes
+        
+        Returns:
+            List[np.ndarray]: Saídas na mesma ordem da entrada
+        """
+        inputs_meta = {inp.name: inp for inp in self.model.get_inputs()}
+        batch_dim = inputs_meta["audio"].shape[0] if "audio" in inputs_meta else 1
+        if isinstance(batch_dim, int):
+            return [self._run_onnx(audio, f0) for audio, f0 in zip(audios, f0s)]
+        
+        # Buckets de 1 segundo limitam o padding desperdiçado
+        buckets: Dict[int, List[int]] = {}
+        for i, audio in enumerate(audios):
+            buckets.setdefault(-(-audio.shape[-1] // self.SAMPLE_RATE), []).append(i)
+        
+        results: List[Any] = [None] * len(audios)
+        for indices in buckets.values():
+            lens = np.array([audios[i].shape[-1] for i in indices], dtype=np.int64)
+            f0_lens = [f0s[i].shape[-1] for i in indices]
+            audio_batch = np.zeros((len(indices), int(lens.max())), dtype=np.float32)
+            f0_batch = np.zeros((len(indices), max(f0_lens)), dtype=np.float32)
+            for row, i in enumerate(indices):
+                audio_batch[row, :lens[row]] = audios[i]
+                f0_batch[row, :f0_lens[row]] = f0s[i]
+            
+            feeds = {"audio": audio_batch, "f0": f0_batch}
+            if "audio_lens" in inputs_meta:
+                feeds["audio_lens"] = lens
+            
+            output = self.model.run(None, feeds)[0]
+            out_len = output.shape[-1]
+            for row, i in enumerate(indices):
+                # Remover o trecho correspondente ao padding
+                valid = int(round(out_len * lens[row] / audio_batch.shape[1]))
+                results[i] = output[row, ..., :valid].squeeze()
+        
+        return results
     
     def _post_process(
         self,
@@ -922,22 +1578,24 @@ class RVCService:
         rms_converted = np.sqrt(np.mean(converted ** 2) + 1e-8)
         
         # Normalizar para RMS do original
+        # Nota: converted pode ser o mesmo array que original (fallback de
+        # _apply_conversion); esta multiplicação aloca um array novo, então
+        # nenhuma operação abaixo altera o áudio original.
         if rms_converted > 0:
             converted = converted * (rms_original / rms_converted)
         
         # Mixar com RMS original se solicitado
+        # (in-place: converted já é um array próprio após a normalização)
         if rms_mix_rate > 0 and len(converted) == len(original):
-            converted = (
-                converted * (1 - rms_mix_rate) +
-                original * rms_mix_rate
-            )
+            np.multiply(converted, 1 - rms_mix_rate, out=converted)
+            converted += original * rms_mix_rate
         
         # Normalizar para evitar clipping
         max_val = np.abs(converted).max()
         if max_val > 1.0:
-            converted = converted / max_val * 0.95
+            converted *= 0.95 / max_val
         
-        return converted.astype(np.float32)
+        return converted.astype(np.float32, copy=False)
     
     def _save_audio(
         self,
@@ -953,8 +1611,9 @@ class RVCService:
             sr: Taxa de amostragem
             path: Caminho de saída
         """
-        # Converter para int16
-        audio_int16 = (audio * 32767).astype(np.int16)
+        # Converter para int16 (buffer por chamada: _save_audio roda em threads)
+        audio = np.ascontiguousarray(audio, dtype=np.float32).reshape(-1)
+        audio_int16 = _f32_to_i16(audio, np.empty(audio.shape[0], dtype=np.int16))
         
         # Salvar com scipy
         if NUMPY_AVAILABLE:
@@ -969,7 +1628,7 @@ class RVCService:
             wav_file.setnchannels(1)
             wav_file.setsampwidth(2)  # 16-bit
             wav_file.setframerate(sr)
-            wav_file.writeframes(audio_int16.tobytes())
+            wav_file.writeframesraw(audio_int16.tobytes())
     
     async def _mock_convert(
         self,
@@ -985,7 +1644,11 @@ class RVCService:
         # Tentar obter duração real do áudio
         duration = 10.0  # Default
         
-        if LIBROSA_AVAILABLE:
+        # WAV: ler só o header RIFF, sem decodificar
+        header = _read_wav_header(input_audio_path)
+        if header is not None:
+            duration = header[0] / header[1]
+        elif LIBROSA_AVAILABLE:
             try:
                 duration = librosa.get_duration(path=input_audio_path)
             except Exception:
@@ -1001,23 +1664,12 @@ class RVCService:
         await asyncio.sleep(min(duration * 0.1, 2.0))
         
         # Gerar arquivo de saída
-        file_id = str(uuid.uuid4())
-        output_dir = Path(settings.output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{file_id}_converted.wav"
+        file_id = secrets.token_hex(16)
+        output_path = self._output_dir / f"{file_id}_converted.wav"
         
-        # Criar áudio silencioso
+        # Criar áudio silencioso (blocos fixos, fora do event loop)
         samples = int(duration * self.SAMPLE_RATE)
-        
-        if NUMPY_AVAILABLE:
-            silence = np.zeros(samples, dtype=np.int16)
-            wavfile.write(str(output_path), self.SAMPLE_RATE, silence)
-        else:
-            with wave.open(str(output_path), 'w') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(self.SAMPLE_RATE)
-                wav_file.writeframes(bytes(samples * 2))
+        await asyncio.to_thread(write_silence_wav, str(output_path), samples, self.SAMPLE_RATE)
         
         logger.warning(
             f"Mock conversion: {duration:.2f}s "
@@ -1056,18 +1708,24 @@ class RVCService:
                 self._extract_pitch, audio, sr
             )
             
-            # Calcular estatísticas de F0
-            voiced_f0 = f0[f0 > 0]
+            # Calcular estatísticas de F0 (passada única)
+            f0_mean, f0_std, f0_min, f0_max, voiced_ratio = _f0_stats(
+                np.ascontiguousarray(f0, dtype=np.float64)
+            )
+            
+            # RMS via produto interno (sem array temporário de audio ** 2)
+            n_samples = audio.shape[0]
+            rms = float(np.sqrt(np.dot(audio, audio) / n_samples)) if n_samples else 0.0
             
             return {
-                "duration": len(audio) / sr,
+                "duration": n_samples / sr,
                 "sample_rate": sr,
-                "f0_mean": float(voiced_f0.mean()) if len(voiced_f0) > 0 else 0,
-                "f0_std": float(voiced_f0.std()) if len(voiced_f0) > 0 else 0,
-                "f0_min": float(voiced_f0.min()) if len(voiced_f0) > 0 else 0,
-                "f0_max": float(voiced_f0.max()) if len(voiced_f0) > 0 else 0,
-                "voiced_ratio": len(voiced_f0) / len(f0) if len(f0) > 0 else 0,
-                "rms": float(np.sqrt(np.mean(audio ** 2))) if NUMPY_AVAILABLE else 0
+                "f0_mean": float(f0_mean),
+                "f0_std": float(f0_std),
+                "f0_min": float(f0_min),
+                "f0_max": float(f0_max),
+                "voiced_ratio": float(voiced_ratio),
+                "rms": rms
             }
             
         except Exception as e:
@@ -5,6 +5,7 @@ Placeholder para futuras implementações de treino de modelos
 de conversão de voz customizados.
 """
 
+import threading
 from typing import Any, Dict, List, Optional
 from enum import Enum
 from dataclasses import dataclass
@@ -267,13 +268,17 @@ class TrainingService:
 
 # Singleton do serviço
 _training_service: Optional[TrainingService] = None
+_training_service_lock = threading.Lock()
 
 
 def get_training_service() -> TrainingService:
     """Retorna instância singleton do serviço de treinamento."""
     global _training_service
     
+    # Double-checked locking: o lock só é adquirido enquanto não há instância
     if _training_service is None:
-        _training_service = TrainingService()
+        with _training_service_lock:
+            if _training_service is None:
+                _training_service = TrainingService()
     
     return _training_service
@@ -0,0 +1,226 @@
+"""
+Serviço de transcrição de áudio com faster-whisper.
+
+Gera a transcrição do áudio de referência usado pelo F5-TTS.
+Usa o backend CTranslate2 com quantização int8 em CPU, bem
+mais rápido que o Whisper de referência (PyTorch, fp32).
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from backend.config import get_settings
+from backend.services.cache_service import MemoryCache
+from backend.utils.logger import get_logger
+
+# Import condicional do faster-whisper
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+    WhisperModel = None
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class TranscriptionService:
+    """
+    Transcrição de áudio usando faster-whisper (CTranslate2).
+
+    O modelo roda em CPU com pesos int8, deixando a GPU livre
+    para o F5-TTS e o RVC.
+
+    Attributes:
+        model: Modelo WhisperModel carregado
+        is_loaded: Status do modelo
+    """
+
+    # Configurações de modelo
+    # "tiny" basta para transcrever referências curtas de idioma conhecido
+    MODEL_NAME = settings.whisper_model
+    DEVICE = "cpu"
+    COMPUTE_TYPE = "int8"
+    BEAM_SIZE = 1
+    # Silero-VAD embutido: trechos sem fala não passam pelo encoder
+    VAD_PARAMETERS = {"min_silence_duration_ms": 500}
+
+    def __init__(self):
+        """Inicializa o serviço de transcrição."""
+        self.model = None
+        self.is_loaded = False
+        self._load_lock = threading.Lock()
+        # Transcrições por (hash do conteúdo, idioma)
+        self._cache = MemoryCache(max_size=128, default_ttl=settings.cache_ttl_seconds)
+        self._cpu_threads = max(1, (os.cpu_count() or 2) // 2)
+
+        if not FASTER_WHISPER_AVAILABLE:
+            logger.warning(
+                "faster-whisper não instalado. "
+                "Transcrição ficará a cargo do F5-TTS."
+            )
+
+    def load_model(self) -> bool:
+        """
+        Carrega o modelo Whisper (síncrono).
+
+        Returns:
+            bool: True se o modelo está disponível
+        """
+        if self.is_loaded:
+            return self.model is not None
+
+        with self._load_lock:
+            if self.is_loaded:
+                return self.model is not None
+
+            if FASTER_WHISPER_AVAILABLE:
+                try:
+                    model_path, download_root = self._resolve_model_path()
+                    self.model = WhisperModel(
+                        model_path,
+                        download_root=download_root,
+                        device=self.DEVICE,
+                        compute_type=self.COMPUTE_TYPE,
+                        cpu_threads=self._cpu_threads,
+                        num_workers=1
+                    )
+                    logger.info(
+                        f"Whisper carregado: {self.MODEL_NAME} "
+                        f"({self.COMPUTE_TYPE}, {self._cpu_threads} threads)"
+                    )
+                except Exception as e:
+                    logger.error(f"Erro ao carregar Whisper: {e}")
+                    self.model = None
+
+            self.is_loaded = True
+            return self.model is not None
+
+    def _resolve_model_path(self) -> Tuple[str, Optional[str]]:
+        """
+        Resolve o modelo CTranslate2 a carregar.
+        
+        Prefere o modelo já convertido em models/whisper/<nome>-ct2
+        (baixado por scripts/download_models.py). Caso não exista, baixa
+        pelo nome para models/whisper, de forma que todos os workers
+        compartilhem a mesma cópia em disco.
+        
+        Returns:
+            Tuple (caminho ou nome do modelo, download_root)
+        """
+        whisper_dir = Path(settings.models_dir) / "whisper"
+        local_model = whisper_dir / f"{self.MODEL_NAME}-ct2"
+        if (local_model / "model.bin").exists():
+            return str(local_model), None
+        return self.MODEL_NAME, str(whisper_dir)
+
+    def transcribe_sync(self, audio_path: str, language: Optional[str] = None) -> str:
+        """
+        Transcreve um arquivo de áudio (síncrono).
+
+        Args:
+            audio_path: Caminho do arquivo de áudio
+            language: Código do idioma (ex: "pt-BR"); None = auto-detectar
+
+        Returns:
+            str: Texto transcrito (vazio se indisponível ou em caso de erro)
+        """
+        # Whisper usa códigos ISO 639-1 ("pt-BR" -> "pt")
+        whisper_lang = language.split("-")[0].lower() if language else None
+
+        cache_key = self._cache_key(audio_path, whisper_lang)
+        if cache_key is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if not self.load_model():
+            return ""
+
+        try:
+            segments, info = self.model.transcribe(
+                audio_path,
+                language=whisper_lang,
+                beam_size=self.BEAM_SIZE,
+                vad_filter=True,
+                vad_parameters=self.VAD_PARAMETERS
+            )
+            # segments é um gerador: a decodificação acontece aqui
+            text = " ".join(segment.text.strip() for segment in segments).strip()
+            logger.debug(f"Transcrição ({info.language}): {text[:80]}")
+            if text and cache_key is not None:
+                self._cache.set(cache_key, text)
+            return text
+        except Exception as e:
+            logger.error(f"Erro na transcrição: {e}")
+            return ""
+
+    def _cache_key(self, audio_path: str, language: Optional[str]) -> Optional[str]:
+        """
+        Gera chave de cache a partir do conteúdo do arquivo.
+
+        O hash é do conteúdo (e não do caminho) porque o F5-TTS grava o
+        áudio de referência recortado em arquivos temporários novos.
+        """
+        # Leitura em blocos de 1MB (hashlib.file_digest só existe no 3.11+)
+        digest = hashlib.sha1()
+        try:
+            with open(audio_path, "rb") as f:
+                while chunk := f.read(1 << 20):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return f"{digest.hexdigest()}:{language or 'auto'}"
+
+    async def transcribe(self, audio_path: str, language: Optional[str] = None) -> str:
+        """
+        Transcreve um arquivo de áudio em thread separada.
+
+        Args:
+            audio_path: Caminho do arquivo de áudio
+            language: Código do idioma (ex: "pt-BR")
+
+        Returns:
+            str: Texto transcrito
+        """
+        return await asyncio.to_thread(self.transcribe_sync, audio_path, language)
+
+    @property
+    def status(self) -> Dict[str, Any]:
+        """Retorna status do serviço."""
+        return {
+            "loaded": self.is_loaded,
+            "model_available": self.model is not None,
+            "faster_whisper_installed": FASTER_WHISPER_AVAILABLE,
+            "model_name": self.MODEL_NAME,
+            "compute_type": self.COMPUTE_TYPE,
+            "cpu_threads": self._cpu_threads,
+        }
+
+
+# Instância singleton para uso global
+_transcription_service: Optional[TranscriptionService] = None
+_transcription_service_lock = threading.Lock()
+
+
+def get_transcription_service() -> TranscriptionService:
+    """
+    Retorna instância singleton do serviço de transcrição.
+
+    Returns:
+        TranscriptionService: Instância do serviço
+    """
+    global _transcription_service
+
+    # Double-checked locking: o lock só é adquirido enquanto não há instância
+    if _transcription_service is None:
+        with _transcription_service_lock:
+            if _transcription_service is None:
+                _transcription_service = TranscriptionService()
+
+    return _transcription_service
@@ -6,20 +6,27 @@ Suporta clonagem zero-shot a partir de áudio de referência.
 """
 
 import asyncio
+import contextlib
+import gc
+import inspect
 import os
-import uuid
+import re
+import secrets
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 # Configurar variáveis de ambiente ROCm ANTES de importar torch
-from backend.config import get_settings
-_settings = get_settings()
-if _settings.use_rocm:
-    os.environ["HSA_OVERRIDE_GFX_VERSION"] = _settings.hsa_override_gfx_version
-    os.environ["ROCR_VISIBLE_DEVICES"] = _settings.rocm_visible_devices
-    os.environ["HIP_VISIBLE_DEVICES"] = _settings.rocm_visible_devices
-    os.environ["PYTORCH_ROCM_ARCH"] = _settings.pytorch_rocm_arch
+from backend.config import configure_rocm_env, get_settings
+configure_rocm_env()
 
+from backend.services.gpu_worker import GPU_EXECUTOR
+from backend.services.transcription_service import get_transcription_service
+from backend.utils.audio import wav_stream_header, write_silence_wav
 from backend.utils.logger import get_logger
 
 # Import PyTorch condicionalmente
@@ -40,13 +47,33 @@ except ImportError:
     DIRECTML_AVAILABLE = False
     torch_directml = None
 
+# Import condicional de NumPy e SciPy
+try:
+    import numpy as np
+    from scipy.io import wavfile
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+    wavfile = None
+
+# Import condicional de soundfile (libsndfile)
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+    sf = None
+
 # Import F5-TTS modules condicionalmente para evitar erros se não instalado
 try:
     from f5_tts.model import DiT
+    from f5_tts.model.utils import convert_char_to_pinyin
     from f5_tts.infer.utils_infer import (
         load_vocoder,
         load_model,
-        infer_process,
+        infer_batch_process,
+        chunk_text,
         preprocess_ref_audio_text
     )
     F5_TTS_AVAILABLE = True
@@ -56,6 +83,92 @@ except ImportError:
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Pool de modelos F5-TTS (modelo, vocoder, device efetivo) por device
+# detectado, compartilhado entre instâncias de TTSService: descarregar
+# um serviço não destrói os pesos carregados
+_MODEL_POOL: Dict[str, Tuple[Any, Any, str]] = {}
+_MODEL_POOL_LOCK = threading.Lock()
+
+# Worker único para inferência do F5-TTS (compartilhado com o RVC): um
+# modelo por GPU não se beneficia de chamadas concorrentes, que só
+# disputariam memória
+_TTS_EXECUTOR = GPU_EXECUTOR
+
+# Escrita dos WAVs fora do worker do F5-TTS: a próxima inferência começa
+# enquanto o áudio anterior ainda está sendo gravado em disco
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="audio-io")
+
+# Cache LRU de áudios de referência já decodificados e reamostrados,
+# chave: (caminho absoluto, mtime)
+_REF_CACHE: "OrderedDict[Tuple[str, float], Tuple[Any, int]]" = OrderedDict()
+_REF_CACHE_MAX_SIZE = 32
+_REF_CACHE_LOCK = threading.Lock()
+
+# Referências pré-processadas (áudio recortado, transcrição) por
+# (caminho, mtime, tamanho, idioma, transcrição informada): evita recortar
+# e transcrever de novo
+_PREP_CACHE: "OrderedDict[Tuple[str, float, int, str, str], Tuple[str, str]]" = OrderedDict()
+_PREP_CACHE_MAX_SIZE = 32
+_PREP_CACHE_LOCK = threading.Lock()
+
+# Transcrições (<áudio>.txt) só são gravadas ao lado de referências sob
+# upload_dir (uploads e perfis), nunca em caminhos vindos da requisição
+_SIDECAR_ROOT = Path(settings.upload_dir).resolve()
+
+# Fronteiras de frase para síntese em streaming
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?؟。])\s+")
+
+# Mensagem de operador sem implementação no backend (PyTorch/DirectML)
+_NOT_IMPLEMENTED_RE = re.compile(r"not (currently )?implemented", re.IGNORECASE)
+
+
+def _is_unsupported_operator(error: Exception) -> bool:
+    """
+    Indica se o erro é de operador sem implementação no backend.
+    
+    O PyTorch sinaliza com NotImplementedError; o torch-directml às
+    vezes com RuntimeError, mas com a mesma mensagem ("not implemented").
+    """
+    return isinstance(error, NotImplementedError) or _NOT_IMPLEMENTED_RE.search(str(error)) is not None
+
+
+@lru_cache(maxsize=1)
+def _detect_device() -> str:
+    """
+    Detecta melhor dispositivo disponível (uma vez por processo).
+    
+    Prioridade: CUDA/ROCm > DirectML > MPS > CPU
+    """
+    if not TORCH_AVAILABLE:
+        return "cpu"
+    
+    # Verificar CUDA/ROCm
+    if torch.cuda.is_available():
+        device_name = torch.cuda.get_device_name(0) if torch.cuda.device_count() > 0 else "Unknown"
+        logger.info(f"GPU detectada: {device_name}")
+        is_rocm = hasattr(torch.version, 'hip') and torch.version.hip is not None
+        if is_rocm:
+            logger.info(f"Usando ROCm {torch.version.hip}")
+        # Fixar device padrão uma vez (torch.cuda.device() como contexto não persiste)
+        if ":" in settings.gpu_device:
+            torch.cuda.set_device(torch.device(settings.gpu_device))
+        return settings.gpu_device
+    
+    # Verificar DirectML (WSL com GPU AMD)
+    if DIRECTML_AVAILABLE and settings.use_directml:
+        try:
+            dml = torch_directml.device(settings.directml_device_id)
+            logger.info(f"Usando DirectML: {dml}")
+            return str(dml)
+        except Exception as e:
+            logger.warning(f"DirectML falhou: {e}")
+    
+    # Fallback MPS (Mac)
+    if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
+        return "mps"
+    
+    return "cpu"
+
 
 class TTSService:
     """
@@ -84,46 +197,24 @@ class TTSService:
         """Inicializa o serviço TTS."""
         self.model = None
         self.vocoder = None
-        self.device = self._get_device()
+        self.device = _detect_device()
         self._model_device = self.device  # Device real usado pelo modelo F5-TTS
         self.is_loaded = False
         
-        logger.info(f"TTSService inicializado (device: {self.device})")
-        if TORCH_AVAILABLE and settings.use_rocm:
-            logger.info(f"ROCm configurado: HSA_GFX={settings.hsa_override_gfx_version}, ARCH={settings.pytorch_rocm_arch}")
-    
-    def _get_device(self) -> str:
-        """
-        Detecta melhor dispositivo disponível.
-        
-        Prioridade: CUDA/ROCm > DirectML > MPS > CPU
-        """
-        if not TORCH_AVAILABLE:
-            return "cpu"
+        # Diretório de saída resolvido e criado uma única vez
+        self._output_dir = Path(settings.output_dir)
+        self._output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Verificar CUDA/ROCm
-        if torch.cuda.is_available():
-            device_name = torch.cuda.get_device_name(0) if torch.cuda.device_count() > 0 else "Unknown"
-            logger.info(f"GPU detectada: {device_name}")
-            is_rocm = hasattr(torch.version, 'hip') and torch.version.hip is not None
-            if is_rocm:
-                logger.info(f"Usando ROCm {torch.version.hip}")
-            return settings.gpu_device
-        
-        # Verificar DirectML (WSL com GPU AMD)
-        if DIRECTML_AVAILABLE and settings.use_directml:
-            try:
-                dml = torch_directml.device(settings.directml_device_id)
-                logger.info(f"Usando DirectML: {dml}")
-                return str(dml)
-            except Exception as e:
-                logger.warning(f"DirectML falhou: {e}")
+        # Micro-batching: fila de requisições e tarefa coletora (lazy)
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
         
-        # Fallback MPS (Mac)
-        if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
-            return "mps"
+        # Sínteses idênticas em andamento, compartilhadas entre chamadores
+        self._inflight: Dict[Tuple[Any, ...], asyncio.Task] = {}
         
-        return "cpu"
+        logger.info(f"TTSService inicializado (device: {self.device})")
+        if TORCH_AVAILABLE and settings.use_rocm:
+            logger.info(f"ROCm configurado: HSA_GFX={settings.hsa_override_gfx_version}, ARCH={settings.pytorch_rocm_arch}")
     
     async def load_model(self) -> bool:
         """
@@ -143,7 +234,13 @@ class TTSService:
         try:
             logger.info("Carregando modelo F5-TTS...")
             # Executar carregamento em thread separada
-            await asyncio.to_thread(self._load_model_sync)
+            warmup = await asyncio.to_thread(self._load_model_sync)
+            if warmup:
+                # Warmup no worker da GPU: é a thread que roda as sínteses
+                # (e onde os CUDA graphs do reduce-overhead são capturados),
+                # sem sobrepor forwards do RVC já enfileirados
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(_TTS_EXECUTOR, self._warmup)
             self.is_loaded = True
             logger.info(f"F5-TTS carregado com sucesso no dispositivo: {self.device}")
             return True
@@ -154,61 +251,289 @@ class TTSService:
             self.is_loaded = True
             return True
     
-    def _load_model_sync(self) -> None:
-        """Carregamento síncrono do modelo (executado em thread)."""
+    def _load_model_sync(self) -> bool:
+        """
+        Carregamento síncrono do modelo (executado em thread).
+        
+        Returns:
+            bool: True se os pesos acabaram de ser carregados e pedem warmup
+        """
+        pooled, warmup = self._pooled_model(self.device)
+        
+        # Armazenar device real do modelo para inferência
+        self.model, self.vocoder, self._model_device = pooled
+        
+        return warmup
+    
+    def _pooled_model(self, device: str) -> Tuple[Tuple[Any, Any, str], bool]:
+        """
+        Obtém (modelo, vocoder, device efetivo) do pool, carregando se preciso.
+        
+        Args:
+            device: Device de destino (chave do pool)
+        
+        Returns:
+            Tuple (entrada do pool, True se acabou de ser carregada)
+        """
         base_dir = Path(settings.models_dir) / "f5-tts" / "F5TTS_Base"
         pt_ckpt = base_dir / "model_1200000.pt"
         st_ckpt = base_dir / "model_1200000.safetensors"
         ckpt_path = str(pt_ckpt) if pt_ckpt.exists() else (str(st_ckpt) if st_ckpt.exists() else "")
         vocab_path = str(base_dir / "vocab.txt")
         
-        # F5-TTS não suporta DirectML nativamente - usar CPU para carregamento
-        # e converter para device alvo depois se necessário
-        model_device = self.device
-        if self.device.startswith("privateuseone"):
-            logger.info("F5-TTS não suporta DirectML, usando CPU para modelo")
-            model_device = "cpu"
-        
-        self.model = load_model(
-            model_cls=DiT,
-            model_cfg=dict(dim=1024, depth=22, heads=16, ff_mult=2, text_dim=512, conv_layers=4),
-            ckpt_path=ckpt_path,
-            mel_spec_type="vocos",
-            vocab_file=vocab_path if Path(vocab_path).exists() else "",
-            device=model_device
+        # F5-TTS não carrega direto em DirectML: carregar em CPU e depois
+        # tentar mover os pesos para o device DirectML
+        is_directml = device.startswith("privateuseone")
+        load_device = "cpu" if is_directml else device
+        
+        if load_device.startswith("cuda"):
+            self._configure_cuda_backends()
+        
+        with _MODEL_POOL_LOCK:
+            pooled = _MODEL_POOL.get(device)
+            if pooled is None:
+                model = load_model(
+                    model_cls=DiT,
+                    model_cfg=dict(dim=1024, depth=22, heads=16, ff_mult=2, text_dim=512, conv_layers=4),
+                    ckpt_path=ckpt_path,
+                    mel_spec_type="vocos",
+                    vocab_file=vocab_path if Path(vocab_path).exists() else "",
+                    device=load_device
+                )
+                vocoder = load_vocoder(is_local=False, local_path="", device=load_device)
+                
+                model_device = load_device
+                if is_directml:
+                    model_device = self._move_to_directml(model, vocoder, device)
+                
+                if model_device.startswith("cuda") and settings.tts_precision in ("fp16", "bf16"):
+                    # Só o DiT: o mel spectrogram (STFT) do CFM e o vocoder
+                    # continuam em fp32
+                    model.transformer.to(self._autocast_dtype())
+                
+                if settings.tts_cpu_quantization and model_device == "cpu":
+                    self._quantize_model(model)
+                
+                if settings.tts_compile_model and model_device.startswith("cuda"):
+                    self._compile_model(model, vocoder)
+                elif settings.tts_trace_vocoder and model_device == "cpu":
+                    self._trace_vocoder(vocoder)
+                
+                pooled = _MODEL_POOL[device] = (model, vocoder, model_device)
+                warmup = True
+            else:
+                logger.info(f"F5-TTS reutilizado do pool ({device})")
+                warmup = False
+        
+        return pooled, warmup
+    
+    def _warmup(self) -> None:
+        """
+        Executa uma síntese descartável logo após o carregamento.
+        
+        Paga uma única vez (fora do caminho das requisições) a compilação
+        de kernels, a busca de algoritmos do cuDNN e as alocações iniciais
+        do vocoder, que de outra forma recairiam sobre a primeira síntese.
+        """
+        try:
+            # 1s de ruído baixo em memória: silêncio puro zera o RMS que o
+            # F5-TTS usa para normalizar a referência
+            reference = (torch.randn(1, self.SAMPLE_RATE) * 0.01, self.SAMPLE_RATE)
+            with self._inference_context():
+                self._infer(reference, "hi. ", "hi", 1.0)
+            logger.info("F5-TTS aquecido (warmup concluído)")
+        except Exception as e:
+            logger.warning(f"Warmup do F5-TTS falhou: {e}")
+    
+    @staticmethod
+    def _configure_cuda_backends() -> None:
+        """
+        Ajusta os backends CUDA para inferência.
+        
+        TF32 nas matmuls/convoluções fp32 (Ampere+; sem efeito em ROCm)
+        e, opcionalmente, cudnn.benchmark.
+        """
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.backends.cudnn.benchmark = settings.tts_cudnn_benchmark
+    
+    def _compile_model(self, model: Any, vocoder: Any) -> None:
+        """
+        Compila o transformer (DiT) do F5-TTS e o vocoder com torch.compile.
+        
+        O modo vem de settings.tts_compile_mode. No padrão,
+        reduce-overhead, o Inductor também captura CUDA graphs: os 32
+        passos do sampler têm a mesma forma e reusam o mesmo graph, sem
+        overhead de dispatch Python/lançamento de kernels ("default" e
+        "max-autotune-no-cudagraphs" não capturam). Formas dinâmicas
+        evitam recompilar a cada duração de saída; a referência não é
+        preenchida com padding porque isso alteraria o condicionamento
+        (e a voz) da síntese.
+        
+        Os grafos do Inductor ficam em models/inductor_cache, de forma
+        que reinícios do processo não recompilam do zero.
+        """
+        cache_dir = Path(settings.models_dir) / "inductor_cache"
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(cache_dir.resolve()))
+        try:
+            torch._inductor.config.fx_graph_cache = True
+        except AttributeError:
+            pass
+        
+        try:
+            model.transformer = torch.compile(
+                model.transformer,
+                mode=settings.tts_compile_mode,
+                dynamic=True
+            )
+            logger.info(f"Transformer F5-TTS compilado (torch.compile, {settings.tts_compile_mode})")
+        except Exception as e:
+            logger.warning(f"torch.compile falhou, usando modo eager: {e}")
+            return
+        
+        try:
+            # O F5-TTS chama vocoder.decode(), não forward()
+            vocoder.decode = torch.compile(vocoder.decode, dynamic=True)
+            logger.info("Vocoder compilado (torch.compile)")
+        except Exception as e:
+            logger.warning(f"torch.compile do vocoder falhou, usando modo eager: {e}")
+    
+    def _quantize_model(self, model: Any) -> None:
+        """
+        Quantiza dinamicamente (int8) as camadas Linear do DiT em CPU.
+        
+        Pesos int8 reduzem a banda de memória das matmuls a 1/4; as
+        ativações continuam em fp32. Apenas o transformer é quantizado:
+        o mel spectrogram do CFM e o vocoder (convolucional) ficam em
+        fp32, onde a quantização prejudicaria a qualidade do áudio.
+        """
+        try:
+            model.transformer = torch.ao.quantization.quantize_dynamic(
+                model.transformer,
+                {torch.nn.Linear},
+                dtype=torch.qint8
+            )
+            logger.info("Transformer F5-TTS quantizado (int8 dinâmico, CPU)")
+        except Exception as e:
+            logger.warning(f"Quantização int8 falhou, usando fp32: {e}")
+    
+    def _trace_vocoder(self, vocoder: Any) -> None:
+        """
+        Substitui vocoder.decode por uma versão traçada com torch.jit (CPU).
+        
+        O Vocos é um grafo fixo (ConvNeXt + ISTFT), bom alvo para o
+        TorchScript. O módulo traçado é salvo em models/f5-tts e
+        reaproveitado nos próximos processos. O trace só é aceito se
+        reproduzir a saída eager num comprimento diferente do exemplo
+        (formas fixadas no trace quebrariam outras durações).
+        """
+        cache_path = (
+            Path(settings.models_dir) / "f5-tts"
+            / f"vocoder.traced.cpu.torch{torch.__version__.split('+')[0]}.pt"
         )
+        try:
+            with torch.no_grad():
+                if cache_path.exists():
+                    traced = torch.jit.load(str(cache_path), map_location="cpu")
+                else:
+                    # 100 bandas mel (Vocos 24kHz), ~2s de áudio
+                    example = torch.randn(1, 100, 200)
+                    traced = torch.jit.trace_module(vocoder, {"decode": example})
+                
+                check = torch.randn(1, 100, 157)
+                if not torch.allclose(traced.decode(check), vocoder.decode(check), atol=1e-4):
+                    logger.warning("Vocoder traçado diverge do eager, mantendo modo eager")
+                    return
+                
+                if not cache_path.exists():
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    torch.jit.save(traced, str(cache_path))
+            
+            vocoder.decode = traced.decode
+            logger.info("Vocoder traçado com torch.jit (CPU)")
+        except Exception as e:
+            logger.warning(f"torch.jit.trace do vocoder falhou, usando modo eager: {e}")
+    
+    def _move_to_directml(self, model: Any, vocoder: Any, device: str) -> str:
+        """
+        Move modelo e vocoder (carregados em CPU) para o DirectML.
         
-        # Armazenar device real do modelo para inferência
-        self._model_device = model_device
+        Returns:
+            str: Device efetivo ("privateuseone:N" ou "cpu" se falhar)
+        """
+        try:
+            model.to(device)
+            vocoder.to(device)
+            logger.info(f"F5-TTS movido para DirectML ({device})")
+            return device
+        except Exception as e:
+            logger.warning(f"DirectML não suportou o F5-TTS, usando CPU: {e}")
+            model.to("cpu")
+            vocoder.to("cpu")
+            return "cpu"
+    
+    def _fallback_to_cpu(self) -> None:
+        """
+        Troca este serviço para a cópia em CPU do F5-TTS após falha de operador.
         
-        self.vocoder = load_vocoder(is_local=False, local_path="", device=model_device)
+        Os pesos em DirectML do pool não são movidos: outras instâncias
+        continuam usando-os com o device que conhecem. A cópia em CPU
+        vem do próprio pool (chave "cpu"), carregada uma vez e
+        compartilhada pelas instâncias que também caírem aqui.
+        """
+        logger.warning("Operador não suportado no DirectML, usando F5-TTS em CPU")
+        pooled, _ = self._pooled_model("cpu")
+        self.model, self.vocoder, self._model_device = pooled
     
     async def unload_model(self) -> None:
-        """Descarrega modelo para liberar memória."""
-        if self.model is not None:
-            del self.model
-            self.model = None
+        """
+        Descarrega modelo deste serviço.
         
-        if self.vocoder is not None:
-            del self.vocoder
-            self.vocoder = None
+        Apenas solta as referências: os pesos continuam no pool
+        compartilhado. Não chama gc.collect() nem empty_cache(): o
+        allocator do PyTorch continua "quente" para as próximas sínteses.
+        Use hard_unload() no encerramento do processo.
+        """
+        self.model = None
+        self.vocoder = None
+        
+        if TORCH_AVAILABLE and torch.cuda.is_available():
+            stats = torch.cuda.memory_stats()
+            logger.debug(
+                "Memória CUDA após unload",
+                allocated_mb=round(stats.get("allocated_bytes.all.current", 0) / 2**20, 1),
+                reserved_mb=round(stats.get("reserved_bytes.all.current", 0) / 2**20, 1),
+            )
+        
+        self.is_loaded = False
+        logger.info("Modelo TTS descarregado")
+    
+    async def hard_unload(self) -> None:
+        """Descarrega o modelo e libera de fato pesos e cache da GPU."""
+        await self.unload_model()
+        self.purge_pool()
+    
+    @classmethod
+    def purge_pool(cls) -> None:
+        """Remove todos os modelos do pool compartilhado e libera a GPU."""
+        with _MODEL_POOL_LOCK:
+            _MODEL_POOL.clear()
         
-        # Forçar garbage collection antes de limpar cache GPU
-        import gc
         gc.collect()
         
         if TORCH_AVAILABLE and torch.cuda.is_available():
             torch.cuda.empty_cache()
         
-        self.is_loaded = False
-        logger.info("Modelo TTS descarregado")
+        logger.info("Pool de modelos TTS liberado")
     
     async def synthesize(
         self,
         text: str,
         reference_audio: str,
         language: str = "pt-BR",
-        speed: float = 1.0
+        speed: float = 1.0,
+        reference_text: Optional[str] = None,
+        return_audio: bool = False
     ) -> Dict[str, Any]:
         """
         Sintetiza texto com voz clonada.
@@ -218,33 +543,80 @@ class TTSService:
             reference_audio: Caminho do áudio de referência
             language: Código do idioma
             speed: Velocidade da fala (0.5-2.0)
+            reference_text: Transcrição da referência (dispensa o Whisper)
+            return_audio: Devolver o áudio em memória (chave "audio",
+                float32 mono) em vez de gravar o WAV; usado pelo pipeline
+                TTS -> RVC. O modo mock sempre grava arquivo
         
         Returns:
-            Dict com audio_url, duration, sample_rate
+            Dict com audio_url (ou audio), duration, sample_rate
         """
+        # Áudio em memória não é compartilhado: o RVC o altera in-place
+        if return_audio:
+            return await self._synthesize_once(
+                text, reference_audio, language, speed, reference_text, True
+            )
+        
+        # Requisições idênticas simultâneas aguardam a mesma síntese; o
+        # WAV gerado é imutável, então a mesma URL serve a todas
+        key = (text, reference_audio, language, round(speed, 3), reference_text)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._synthesize_once(
+                text, reference_audio, language, speed, reference_text, False
+            ))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # shield: cancelar um chamador não cancela a síntese dos demais
+        return dict(await asyncio.shield(task))
+    
+    async def _synthesize_once(
+        self,
+        text: str,
+        reference_audio: str,
+        language: str,
+        speed: float,
+        reference_text: Optional[str],
+        return_audio: bool
+    ) -> Dict[str, Any]:
+        """Executa uma síntese (ver synthesize), sem deduplicação."""
         if not self.is_loaded:
             await self.load_model()
         
-        # Gerar ID do arquivo de saída
-        file_id = str(uuid.uuid4())
-        output_dir = Path(settings.output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{file_id}.wav"
+        # ID do arquivo de saída: /outputs é servido publicamente, então o
+        # nome precisa continuar imprevisível (contador seria enumerável)
+        file_id = secrets.token_hex(16)
+        output_path = self._output_dir / f"{file_id}.wav"
         
         # Se modelo não está disponível, usar mock
         if self.model is None or not F5_TTS_AVAILABLE or not TORCH_AVAILABLE:
             return await self._mock_synthesize(text, output_path, speed)
         
         try:
-            # Executar síntese em thread separada (operação bloqueante)
-            result = await asyncio.to_thread(
-                self._synthesize_sync,
-                text,
+            # Referência + transcrição (CPU) no pool padrão: sobrepõe-se à
+            # inferência de outras requisições em andamento no executor da GPU
+            ref_audio, ref_text = await asyncio.to_thread(
+                self._prepare_reference,
                 reference_audio,
-                str(output_path),
-                speed
+                language,
+                reference_text
             )
             
+            # Inferência serializada no worker dedicado do F5-TTS,
+            # agrupada com requisições simultâneas da mesma referência
+            if return_audio:
+                result = await self._submit(text, ref_audio, ref_text, None, speed)
+                return {
+                    "audio": result["audio"],
+                    "duration": result["duration"],
+                    "sample_rate": result["sample_rate"]
+                }
+            
+            result = await self._submit(text, ref_audio, ref_text, str(output_path), speed)
+            # O arquivo precisa existir antes de devolver a URL
+            await asyncio.wrap_future(result.pop("write"))
+            
             return {
                 "audio_url": f"/outputs/{file_id}.wav",
                 "duration": result["duration"],
@@ -256,58 +628,656 @@ class TTSService:
             logger.error(f"Erro na síntese: {e}")
             return await self._mock_synthesize(text, output_path, speed)
     
-    def _synthesize_sync(
+    async def synthesize_stream(
         self,
         text: str,
         reference_audio: str,
-        output_path: str,
-        speed: float
-    ) -> Dict[str, Any]:
+        language: str = "pt-BR",
+        speed: float = 1.0,
+        reference_text: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
         """
-        Síntese síncrona (executada em thread pool).
+        Sintetiza texto frase a frase, produzindo um WAV em streaming.
+        
+        O primeiro bloco é o header WAV (tamanho indefinido); cada frase
+        sintetizada vira um bloco PCM 16-bit assim que fica pronta. A
+        referência é pré-processada uma única vez e só o F5-TTS roda por
+        frase, de forma que o primeiro áudio chega após a primeira frase
+        e não após o texto inteiro.
         
         Args:
             text: Texto para sintetizar
             reference_audio: Caminho do áudio de referência
-            output_path: Caminho de saída
+            language: Código do idioma
+            speed: Velocidade da fala (0.5-2.0)
+            reference_text: Transcrição da referência (dispensa o Whisper)
+        
+        Yields:
+            bytes: Header WAV seguido de blocos PCM 16-bit mono
+        """
+        if not self.is_loaded:
+            await self.load_model()
+        
+        sentences = [s for s in (p.strip() for p in _SENTENCE_SPLIT.split(text)) if s]
+        
+        yield wav_stream_header(self.SAMPLE_RATE)
+        
+        # Modo mock: silêncio com a duração estimada de cada frase
+        if self.model is None or not F5_TTS_AVAILABLE or not TORCH_AVAILABLE:
+            for sentence in sentences:
+                yield bytes(int(self._estimate_duration(sentence, speed) * self.SAMPLE_RATE) * 2)
+            return
+        
+        # O header já foi enviado: uma falha encerra o stream no último
+        # bloco completo em vez de propagar no meio da resposta
+        try:
+            ref_audio, ref_text = await asyncio.to_thread(
+                self._prepare_reference,
+                reference_audio,
+                language,
+                reference_text
+            )
+            
+            for sentence in sentences:
+                result = await self._submit(sentence, ref_audio, ref_text, None, speed, pcm=True)
+                yield result["audio"].tobytes()
+        except Exception as e:
+            logger.error(f"Erro na síntese em streaming: {e}")
+    
+    async def prefetch_reference(
+        self,
+        reference_audio: str,
+        language: Optional[str] = None,
+        reference_text: Optional[str] = None
+    ) -> None:
+        """
+        Pré-processa a referência (recorte + transcrição) antecipadamente.
+        
+        Popula o cache de _prepare_reference em CPU enquanto a GPU ainda
+        sintetiza outras requisições. Falhas são apenas registradas: a
+        síntese refaz o pré-processamento e trata o erro.
+        """
+        if not F5_TTS_AVAILABLE or not TORCH_AVAILABLE:
+            return
+        
+        try:
+            await asyncio.to_thread(
+                self._prepare_reference,
+                reference_audio,
+                language,
+                reference_text
+            )
+        except Exception as e:
+            logger.warning(f"Pré-processamento antecipado da referência falhou: {e}")
+    
+    async def _submit(
+        self,
+        text: str,
+        ref_audio: str,
+        ref_text: str,
+        output_path: Optional[str],
+        speed: float,
+        pcm: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Enfileira uma síntese para o micro-batcher e aguarda o resultado.
+        
+        Com tts_max_batch_size <= 1 executa direto no worker do F5-TTS.
+        pcm=True devolve "audio" já em int16 (ver _finish).
+        """
+        loop = asyncio.get_running_loop()
+        
+        if settings.tts_max_batch_size <= 1:
+            return await loop.run_in_executor(
+                _TTS_EXECUTOR,
+                self._synthesize_sync,
+                text,
+                ref_audio,
+                ref_text,
+                output_path,
+                speed,
+                pcm
+            )
+        
+        if self._batch_task is None or self._batch_task.done():
+            self._batch_queue = asyncio.Queue()
+            self._batch_task = asyncio.create_task(self._batch_loop())
+        
+        future = loop.create_future()
+        await self._batch_queue.put(((ref_audio, ref_text, speed), text, output_path, pcm, future))
+        return await future
+    
+    async def _batch_loop(self) -> None:
+        """
+        Coleta requisições por até tts_batch_wait_ms (máx. tts_max_batch_size)
+        e executa cada grupo de mesma referência numa única chamada ao worker.
+        
+        Enquanto um lote roda, novas requisições acumulam na fila e formam
+        o lote seguinte.
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._batch_queue
+        max_wait = settings.tts_batch_wait_ms / 1000
+        
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + max_wait
+            while len(batch) < settings.tts_max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Agrupar por (referência, transcrição, velocidade)
+            groups: Dict[Tuple[str, str, float], List[Any]] = {}
+            for item in batch:
+                groups.setdefault(item[0], []).append(item)
+            
+            for key, items in groups.items():
+                try:
+                    results = await loop.run_in_executor(
+                        _TTS_EXECUTOR,
+                        self._synthesize_batch_sync,
+                        key,
+                        [(text, output_path, pcm) for _, text, output_path, pcm, _ in items]
+                    )
+                except Exception as e:
+                    results = [e] * len(items)
+                
+                for (_, _, _, _, future), result in zip(items, results):
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+    
+    def _synthesize_batch_sync(
+        self,
+        key: Tuple[str, str, float],
+        items: List[Tuple[str, Optional[str], bool]]
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Sintetiza um grupo de textos com a mesma referência.
+        
+        Tenta uma única amostragem em lote; textos que precisariam ser
+        divididos em vários trechos, ou falhas do lote, caem na síntese
+        individual.
+        
+        Args:
+            key: Tuple (áudio de referência, transcrição, velocidade)
+            items: Lista de (texto, caminho de saída ou None, pcm)
+        
+        Returns:
+            Lista com o resultado (ou exceção) de cada item
+        """
+        ref_audio, ref_text, speed = key
+        
+        if len(items) == 1:
+            text, output_path, pcm = items[0]
+            return [self._synthesize_sync(text, ref_audio, ref_text, output_path, speed, pcm)]
+        
+        outputs: List[Optional[Tuple[Any, int]]] = [None] * len(items)
+        try:
+            reference = self._load_reference(ref_audio)
+            with self._inference_context():
+                outputs = self._infer_batch(
+                    reference,
+                    ref_text,
+                    [text for text, _, _ in items],
+                    speed,
+                    [pcm for _, _, pcm in items]
+                )
+        except Exception as e:
+            logger.warning(f"Síntese em lote falhou, processando individualmente: {e}")
+        
+        results: List[Union[Dict[str, Any], Exception]] = []
+        for (text, output_path, pcm), output in zip(items, outputs):
+            try:
+                if output is None:
+                    results.append(self._synthesize_sync(text, ref_audio, ref_text, output_path, speed, pcm))
+                    continue
+                generated_audio, sample_rate = output
+                results.append(self._finish(output_path, generated_audio, sample_rate, pcm))
+            except Exception as e:
+                results.append(e)
+        
+        return results
+    
+    def _synthesize_sync(
+        self,
+        text: str,
+        ref_audio: str,
+        ref_text: str,
+        output_path: Optional[str],
+        speed: float,
+        pcm: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Síntese síncrona (executada no worker dedicado do F5-TTS).
+        
+        Args:
+            text: Texto para sintetizar
+            ref_audio: Áudio de referência já pré-processado
+            ref_text: Transcrição da referência
+            output_path: Caminho de saída (None = devolver em memória)
             speed: Velocidade
+            pcm: Devolver o áudio em memória como int16
         
         Returns:
-            Dict com informações do áudio gerado
+            Dict com informações do áudio gerado (ver _finish)
         """
-        # Processar áudio de referência (não aceita device)
-        ref_audio, ref_text = preprocess_ref_audio_text(
-            reference_audio,
-            ""  # Transcrição vazia = auto-detectar
-        )
+        reference = self._load_reference(ref_audio)
         
         # Executar inferência (usar _model_device para F5-TTS)
-        generated_audio, final_sample_rate, _ = infer_process(
-            ref_audio,
+        try:
+            with self._inference_context():
+                generated_audio, final_sample_rate = self._infer(reference, ref_text, text, speed)
+        except (NotImplementedError, RuntimeError) as e:
+            # DirectML não cobre todos os operadores: repetir em CPU só
+            # nesse caso (OOM, shape inválido etc. sobem normalmente)
+            if not (
+                self._model_device.startswith("privateuseone")
+                and _is_unsupported_operator(e)
+            ):
+                raise
+            self._fallback_to_cpu()
+            with self._inference_context():
+                generated_audio, final_sample_rate = self._infer(reference, ref_text, text, speed)
+        
+        result = self._finish(output_path, generated_audio, final_sample_rate, pcm)
+        
+        logger.info(f"Síntese concluída: {result['duration']:.2f}s, {output_path or 'em memória'}")
+        
+        return result
+    
+    def _finish(
+        self,
+        output_path: Optional[str],
+        generated_audio: Any,
+        sample_rate: int,
+        pcm: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Monta o resultado de uma síntese.
+        
+        Com output_path, agenda a gravação sem bloquear o worker do
+        F5-TTS ("write" é o Future, executado no _IO_EXECUTOR). Sem
+        output_path, devolve o áudio em "audio": float32, ou int16 com
+        pcm=True (o lote já converte no device; o caminho individual
+        recebe float32 do F5-TTS e converte aqui).
+        """
+        result = {
+            "duration": len(generated_audio) / sample_rate,
+            "sample_rate": sample_rate
+        }
+        
+        if output_path is None:
+            audio = np.asarray(generated_audio).reshape(-1)
+            if not pcm:
+                result["audio"] = audio.astype(np.float32, copy=False)
+            elif audio.dtype == np.int16:
+                result["audio"] = audio
+            else:
+                audio = np.clip(audio, -1.0, 1.0)
+                np.multiply(audio, 32767.0, out=audio)
+                result["audio"] = audio.astype(np.int16)
+        else:
+            result["write"] = _IO_EXECUTOR.submit(
+                self._save_wav, output_path, generated_audio, sample_rate
+            )
+        
+        return result
+    
+    def _load_reference(self, ref_audio: str) -> Tuple[Any, int]:
+        """
+        Carrega áudio de referência como tensor mono em SAMPLE_RATE.
+        
+        O resultado é mantido em cache LRU por (caminho, mtime): clonar
+        a mesma voz várias vezes não decodifica nem reamostra de novo.
+        
+        Args:
+            ref_audio: Caminho do áudio de referência (já pré-processado)
+        
+        Returns:
+            Tuple (tensor [1, N], sample_rate)
+        """
+        key = (os.path.abspath(ref_audio), os.path.getmtime(ref_audio))
+        
+        with _REF_CACHE_LOCK:
+            cached = _REF_CACHE.get(key)
+            if cached is not None:
+                _REF_CACHE.move_to_end(key)
+                return cached
+        
+        if SOUNDFILE_AVAILABLE:
+            # Ler só a janela usada como referência, não o arquivo inteiro
+            info = sf.info(ref_audio)
+            frames = min(info.frames, int(settings.max_ref_seconds * info.samplerate))
+            # (amostras, canais) contíguo; transposição feita numa única cópia
+            data, sr = sf.read(ref_audio, frames=frames, dtype="float32", always_2d=True)
+            waveform = torch.from_numpy(np.ascontiguousarray(data.T))
+        else:
+            waveform, sr = torchaudio.load(ref_audio)
+            waveform = waveform[:, :int(settings.max_ref_seconds * sr)]
+        
+        if waveform.shape[0] > 1:
+            waveform = waveform.mean(dim=0, keepdim=True)
+        if sr != self.SAMPLE_RATE:
+            waveform = torchaudio.functional.resample(waveform, sr, self.SAMPLE_RATE)
+            sr = self.SAMPLE_RATE
+        
+        entry = (waveform, sr)
+        with _REF_CACHE_LOCK:
+            _REF_CACHE[key] = entry
+            while len(_REF_CACHE) > _REF_CACHE_MAX_SIZE:
+                _REF_CACHE.popitem(last=False)
+        
+        return entry
+    
+    def _infer(
+        self,
+        reference: Tuple[Any, int],
+        ref_text: str,
+        text: str,
+        speed: float
+    ) -> Tuple[Any, int]:
+        """
+        Executa o F5-TTS sobre uma referência já carregada.
+        
+        Equivalente ao infer_process do F5-TTS, mas recebe o tensor de
+        referência em vez do caminho (evita torchaudio.load por chamada).
+        
+        Args:
+            reference: Tuple (tensor de referência, sample_rate)
+            ref_text: Transcrição da referência
+            text: Texto para sintetizar
+            speed: Velocidade
+        
+        Returns:
+            Tuple (áudio gerado, sample_rate)
+        """
+        audio, sr = reference
+        ref_seconds = audio.shape[-1] / sr
+        
+        # Mesmo cálculo do infer_process: lotes cabem em ~22s com a referência
+        max_chars = int(len(ref_text.encode("utf-8")) / ref_seconds * (22 - ref_seconds) * speed)
+        gen_text_batches = chunk_text(text, max_chars=max_chars)
+        
+        result = infer_batch_process(
+            (audio, sr),
             ref_text,
-            text,
+            gen_text_batches,
             self.model,
             self.vocoder,
             mel_spec_type="vocos",
             speed=speed,
             device=self._model_device
         )
+        # Versões recentes do F5-TTS retornam um gerador
+        if inspect.isgenerator(result):
+            result = next(result)
+        
+        generated_audio, final_sample_rate, _ = result
+        return generated_audio, final_sample_rate
+    
+    def _infer_batch(
+        self,
+        reference: Tuple[Any, int],
+        ref_text: str,
+        texts: List[str],
+        speed: float,
+        pcm: Optional[List[bool]] = None
+    ) -> List[Optional[Tuple[Any, int]]]:
+        """
+        Amostra vários textos com a mesma referência em um único lote.
+        
+        Reproduz o infer_batch_process do F5-TTS (normalização RMS,
+        estimativa de duração, remoção do trecho de referência), mas
+        chama model.sample uma vez com batch = número de textos. Textos
+        que o F5-TTS dividiria em vários trechos ficam de fora (None).
+        
+        Args:
+            reference: Tuple (tensor de referência, sample_rate)
+            ref_text: Transcrição da referência
+            texts: Textos para sintetizar
+            speed: Velocidade
+            pcm: Por texto, converter para int16 no device antes da cópia
+        
+        Returns:
+            Lista com (áudio float32 ou int16, sample_rate) ou None por texto
+        """
+        audio, sr = reference
+        ref_seconds = audio.shape[-1] / sr
+        max_chars = int(len(ref_text.encode("utf-8")) / ref_seconds * (22 - ref_seconds) * speed)
+        
+        indices = [i for i, text in enumerate(texts) if len(chunk_text(text, max_chars=max_chars)) == 1]
+        outputs: List[Optional[Tuple[Any, int]]] = [None] * len(texts)
+        if not indices:
+            return outputs
+        
+        rms = torch.sqrt(torch.mean(torch.square(audio)))
+        if rms < self.TARGET_RMS:
+            audio = audio * self.TARGET_RMS / rms
+        audio = audio.to(self._model_device)
+        
+        ref_audio_len = audio.shape[-1] // self.HOP_LENGTH
+        ref_text_len = len(ref_text.encode("utf-8"))
+        
+        durations = []
+        for i in indices:
+            gen_text_len = len(texts[i].encode("utf-8"))
+            # Mesma regra do F5-TTS: textos muito curtos ficam mais lentos
+            local_speed = 0.3 if gen_text_len < 10 else speed
+            durations.append(ref_audio_len + int(ref_audio_len / ref_text_len * gen_text_len / local_speed))
+        
+        text_list = convert_char_to_pinyin([ref_text + texts[i] for i in indices])
         
-        # Salvar áudio
-        torchaudio.save(
-            output_path,
-            torch.tensor(generated_audio).unsqueeze(0),
-            final_sample_rate
+        generated, _ = self.model.sample(
+            cond=audio.expand(len(indices), -1),
+            text=text_list,
+            duration=torch.tensor(durations, device=audio.device),
+            steps=32,
+            cfg_strength=2.0,
+            sway_sampling_coef=-1
         )
+        generated = generated.to(torch.float32)
         
-        duration = len(generated_audio) / final_sample_rate
+        for row, (i, duration) in enumerate(zip(indices, durations)):
+            mel = generated[row:row + 1, ref_audio_len:duration, :].permute(0, 2, 1)
+            waveform = self.vocoder.decode(mel)
+            if rms < self.TARGET_RMS:
+                waveform = waveform * rms / self.TARGET_RMS
+            waveform = waveform.squeeze()
+            if pcm is not None and pcm[i]:
+                # Clip/escala/cast no device: só o int16 (metade dos bytes) vai para a CPU
+                waveform = waveform.clamp(-1.0, 1.0).mul_(32767.0).to(torch.int16)
+            outputs[i] = (waveform.cpu().numpy(), self.SAMPLE_RATE)
         
-        logger.info(f"Síntese concluída: {duration:.2f}s, {output_path}")
+        return outputs
+    
+    def _inference_context(self) -> contextlib.ExitStack:
+        """
+        Contexto de inferência: sem autograd e, em GPU, autocast.
         
-        return {
-            "duration": duration,
-            "sample_rate": final_sample_rate
-        }
+        Em CUDA/ROCm usa a precisão de settings.tts_precision; em CPU
+        roda em fp32.
+        """
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        
+        if self._model_device.startswith("cuda"):
+            dtype = self._autocast_dtype()
+            if dtype is not None:
+                stack.enter_context(torch.autocast(device_type="cuda", dtype=dtype))
+        
+        return stack
+    
+    @staticmethod
+    def _autocast_dtype() -> Optional[Any]:
+        """
+        Resolve settings.tts_precision para um dtype do PyTorch.
+        
+        Returns:
+            torch.dtype, ou None para fp32 (sem autocast)
+        """
+        precision = settings.tts_precision
+        if precision == "fp32":
+            return None
+        if precision == "fp16":
+            return torch.float16
+        if precision == "bf16":
+            return torch.bfloat16
+        # auto: bf16 evita underflow do fp16 onde há suporte (ex: ROCm MI)
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    
+    def _save_wav(self, output_path: str, audio: Any, sample_rate: int) -> None:
+        """
+        Salva áudio float [-1, 1] como WAV PCM 16-bit.
+        
+        O array NumPy de _infer/_infer_batch vai para soundfile
+        (libsndfile converte float32 -> PCM_16 em C, sem array int16
+        intermediário). Fallback: conversão vetorizada para
+        int16 e escrita com scipy ou wave.
+        
+        Args:
+            output_path: Caminho de saída
+            audio: Áudio gerado (array 1D)
+            sample_rate: Taxa de amostragem
+        """
+        # libsndfile não satura na conversão para inteiro: clipar antes.
+        # In-place: o buffer gerado pelo F5-TTS é descartado após salvar,
+        # então clip e multiply reaproveitam a mesma memória
+        audio_f32 = np.asarray(audio, dtype=np.float32).reshape(-1)
+        np.clip(audio_f32, -1.0, 1.0, out=audio_f32)
+        
+        if SOUNDFILE_AVAILABLE:
+            try:
+                sf.write(output_path, audio_f32, sample_rate, subtype="PCM_16")
+                return
+            except Exception as e:
+                logger.warning(f"soundfile write falhou: {e}")
+        
+        np.multiply(audio_f32, 32767.0, out=audio_f32)
+        self._write_int16(output_path, audio_f32.astype(np.int16, copy=False), sample_rate)
+    
+    def _write_int16(self, output_path: str, audio_int16: Any, sample_rate: int) -> None:
+        """Grava buffer int16 já convertido como WAV PCM 16-bit."""
+        if SOUNDFILE_AVAILABLE:
+            try:
+                sf.write(output_path, audio_int16, sample_rate, subtype="PCM_16")
+                return
+            except Exception as e:
+                logger.warning(f"soundfile write falhou: {e}")
+        
+        try:
+            wavfile.write(output_path, sample_rate, audio_int16)
+        except Exception as e:
+            logger.warning(f"scipy write falhou: {e}")
+            # Fallback para wave (stdlib): uma única escrita do buffer
+            with wave.open(output_path, 'w') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)  # 16-bit
+                wav_file.setframerate(sample_rate)
+                wav_file.writeframes(audio_int16.tobytes())
+    
+    def _prepare_reference(
+        self,
+        reference_audio: str,
+        language: Optional[str] = None,
+        reference_text: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """
+        Pré-processa o áudio de referência e obtém sua transcrição.
+        
+        Se reference_text for informado (ex: transcrição salva no perfil),
+        nenhum ASR é executado. Senão, a transcrição vem do arquivo
+        lateral <referência>.txt, se existir e for mais novo que o áudio.
+        Caso contrário é feita com faster-whisper (int8/CPU) sobre o áudio
+        já recortado pelo F5-TTS e, para referências sob upload_dir,
+        gravada no arquivo lateral para as próximas chamadas. Se não houver transcrição, o texto vazio faz o
+        F5-TTS usar seu ASR interno (transformers, mais lento).
+        
+        O resultado fica em cache LRU em memória: reutilizar a mesma voz
+        (ex: batch_synthesize) não repete recorte nem transcrição.
+        
+        Args:
+            reference_audio: Caminho do áudio de referência
+            language: Idioma do áudio (ex: "pt-BR")
+            reference_text: Transcrição conhecida da referência
+        
+        Returns:
+            Tuple (caminho do áudio processado, transcrição)
+        """
+        reference_text = (reference_text or "").strip()
+        st = os.stat(reference_audio)
+        key = (
+            os.path.abspath(reference_audio), st.st_mtime, st.st_size,
+            language or "", reference_text
+        )
+        
+        with _PREP_CACHE_LOCK:
+            cached = _PREP_CACHE.get(key)
+            if cached is not None and os.path.exists(cached[0]):
+                _PREP_CACHE.move_to_end(key)
+                return cached
+        
+        if reference_text:
+            prepared = preprocess_ref_audio_text(reference_audio, reference_text)
+        else:
+            prepared = self._prepare_reference_uncached(reference_audio, language)
+        
+        with _PREP_CACHE_LOCK:
+            _PREP_CACHE[key] = prepared
+            while len(_PREP_CACHE) > _PREP_CACHE_MAX_SIZE:
+                _PREP_CACHE.popitem(last=False)
+        
+        return prepared
+    
+    def _prepare_reference_uncached(
+        self,
+        reference_audio: str,
+        language: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Pré-processamento de _prepare_reference, sem cache em memória."""
+        # <áudio>.txt (voice.wav.txt): voice.wav e voice.mp3 não dividem arquivo
+        sidecar = Path(reference_audio + ".txt")
+        try:
+            if sidecar.stat().st_mtime >= os.path.getmtime(reference_audio):
+                transcription = sidecar.read_text(encoding="utf-8").strip()
+                if transcription:
+                    return preprocess_ref_audio_text(reference_audio, transcription)
+        except OSError:
+            pass
+        
+        # Texto provisório evita o ASR interno; só queremos o áudio recortado
+        clipped_audio, _ = preprocess_ref_audio_text(reference_audio, "-")
+        
+        transcription = get_transcription_service().transcribe_sync(clipped_audio, language)
+        
+        if not transcription:
+            # Sem transcrição: texto vazio aciona o ASR interno do F5-TTS
+            return preprocess_ref_audio_text(reference_audio, "")
+        
+        if Path(reference_audio).resolve().is_relative_to(_SIDECAR_ROOT):
+            try:
+                sidecar.write_text(transcription, encoding="utf-8")
+            except OSError as e:
+                logger.warning(f"Não foi possível salvar transcrição: {e}")
+        
+        # O áudio já recortado serve: só falta normalizar a pontuação, sem
+        # decodificar e recortar a referência uma segunda vez
+        return clipped_audio, self._normalize_ref_text(transcription)
+    
+    @staticmethod
+    def _normalize_ref_text(ref_text: str) -> str:
+        """Pontuação final do texto de referência, como no preprocess_ref_audio_text."""
+        if not ref_text.endswith(". ") and not ref_text.endswith("。"):
+            ref_text += " " if ref_text.endswith(".") else ". "
+        return ref_text
     
     async def _mock_synthesize(
         self,
@@ -320,27 +1290,11 @@ class TTSService:
         
         Cria arquivo de áudio silencioso com duração estimada.
         """
-        # Estimar duração: ~150 palavras/min, ajustado por velocidade
-        words = len(text.split())
-        duration = (words / 150) * 60 / speed
-        duration = max(1.0, min(duration, 300.0))
+        duration = self._estimate_duration(text, speed)
         
-        # Criar áudio silencioso (para testes)
-        if TORCH_AVAILABLE:
-            samples = int(duration * self.SAMPLE_RATE)
-            silence = torch.zeros(1, samples)
-            torchaudio.save(str(output_path), silence, self.SAMPLE_RATE)
-        else:
-            # Fallback: criar arquivo WAV vazio usando wave (stdlib)
-            import wave
-            samples = int(duration * self.SAMPLE_RATE)
-            with wave.open(str(output_path), 'w') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(self.SAMPLE_RATE)
-                # Escreve silêncio (zeros) - 16-bit silence (2 bytes per sample)
-                silence_data = bytes(samples * 2)
-                wav_file.writeframes(silence_data)
+        # Criar áudio silencioso (para testes) fora do event loop
+        samples = int(duration * self.SAMPLE_RATE)
+        await asyncio.to_thread(write_silence_wav, str(output_path), samples, self.SAMPLE_RATE)
         
         logger.warning(f"Mock synthesis: {duration:.2f}s (modelo não disponível)")
         
@@ -352,6 +1306,13 @@ class TTSService:
             "mock": True
         }
     
+    @staticmethod
+    def _estimate_duration(text: str, speed: float) -> float:
+        """Duração estimada da fala: ~150 palavras/min, ajustada por velocidade."""
+        words = len(text.split())
+        duration = (words / 150) * 60 / speed
+        return max(1.0, min(duration, 300.0))
+    
     async def get_supported_languages(self) -> list:
         """
         Retorna lista de idiomas suportados.
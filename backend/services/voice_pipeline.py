@@ -7,9 +7,10 @@ criar um sistema completo de geração de voz personalizada.
 
 import asyncio
 import os
-import uuid
+import secrets
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional
 
 from backend.config import get_settings
 from backend.utils.logger import get_logger
@@ -21,6 +22,32 @@ logger = get_logger(__name__)
 settings = get_settings()
 
 
+class EmotionPreset(NamedTuple):
+    """Ajustes de pitch e velocidade de um estilo emocional."""
+    pitch_shift: int
+    speed: float
+
+
+# Emoções suportadas e seus ajustes (imutável)
+_EMOTION_PRESETS = MappingProxyType({
+    "neutral": EmotionPreset(pitch_shift=0, speed=1.0),
+    "happy": EmotionPreset(pitch_shift=2, speed=1.1),
+    "sad": EmotionPreset(pitch_shift=-2, speed=0.9),
+    "angry": EmotionPreset(pitch_shift=1, speed=1.2),
+    "calm": EmotionPreset(pitch_shift=-1, speed=0.85),
+    "excited": EmotionPreset(pitch_shift=3, speed=1.15),
+    "whisper": EmotionPreset(pitch_shift=0, speed=0.8),
+    "serious": EmotionPreset(pitch_shift=-1, speed=0.95),
+})
+_NEUTRAL = _EMOTION_PRESETS["neutral"]
+
+# Listagem pré-computada para get_available_emotions
+_AVAILABLE_EMOTIONS = tuple(
+    {"name": name, "pitch_shift": preset.pitch_shift, "speed": preset.speed}
+    for name, preset in _EMOTION_PRESETS.items()
+)
+
+
 class VoicePipeline:
     """
     Pipeline de processamento de voz.
@@ -40,16 +67,7 @@ class VoicePipeline:
     """
     
     # Emoções suportadas e seus ajustes
-    EMOTION_PRESETS = {
-        "neutral": {"pitch_shift": 0, "speed": 1.0},
-        "happy": {"pitch_shift": 2, "speed": 1.1},
-        "sad": {"pitch_shift": -2, "speed": 0.9},
-        "angry": {"pitch_shift": 1, "speed": 1.2},
-        "calm": {"pitch_shift": -1, "speed": 0.85},
-        "excited": {"pitch_shift": 3, "speed": 1.15},
-        "whisper": {"pitch_shift": 0, "speed": 0.8},
-        "serious": {"pitch_shift": -1, "speed": 0.95},
-    }
+    EMOTION_PRESETS = _EMOTION_PRESETS
     
     def __init__(
         self,
@@ -105,7 +123,8 @@ class VoicePipeline:
         text: str,
         reference_audio: str,
         language: Optional[str] = None,
-        speed: float = 1.0
+        speed: float = 1.0,
+        reference_text: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Converte texto em fala usando voz de referência.
@@ -117,6 +136,7 @@ class VoicePipeline:
             reference_audio: Caminho do áudio de referência
             language: Código de idioma (auto-detecta se None)
             speed: Velocidade da fala (0.5-2.0)
+            reference_text: Transcrição da referência (dispensa o Whisper)
         
         Returns:
             Dict com audio_url, duration, sample_rate, etc.
@@ -131,7 +151,8 @@ class VoicePipeline:
             text=text,
             reference_audio=reference_audio,
             language=language,
-            speed=speed
+            speed=speed,
+            reference_text=reference_text
         )
         
         result["detected_language"] = language
@@ -139,6 +160,40 @@ class VoicePipeline:
         
         return result
     
+    async def text_to_speech_stream(
+        self,
+        text: str,
+        reference_audio: str,
+        language: Optional[str] = None,
+        speed: float = 1.0,
+        reference_text: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Converte texto em fala em streaming (WAV, frase a frase).
+        
+        Args:
+            text: Texto para sintetizar
+            reference_audio: Caminho do áudio de referência
+            language: Código de idioma (auto-detecta se None)
+            speed: Velocidade da fala (0.5-2.0)
+            reference_text: Transcrição da referência (dispensa o Whisper)
+        
+        Yields:
+            bytes: Header WAV seguido de blocos PCM 16-bit
+        """
+        if not language:
+            language = self.language_detector.detect(text)
+            logger.info(f"Idioma auto-detectado: {language}")
+        
+        async for chunk in self.tts.synthesize_stream(
+            text=text,
+            reference_audio=reference_audio,
+            language=language,
+            speed=speed,
+            reference_text=reference_text
+        ):
+            yield chunk
+    
     async def voice_conversion(
         self,
         input_audio: str,
@@ -180,7 +235,8 @@ class VoicePipeline:
         language: Optional[str] = None,
         speed: Optional[float] = None,
         pitch_shift: Optional[int] = None,
-        apply_rvc: bool = True
+        apply_rvc: bool = True,
+        reference_text: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Gera fala com estilo emocional.
@@ -199,39 +255,98 @@ class VoicePipeline:
             speed: Velocidade (usa preset de emoção se None)
             pitch_shift: Pitch shift (usa preset de emoção se None)
             apply_rvc: Se deve aplicar RVC após TTS
+            reference_text: Transcrição da referência (dispensa o Whisper)
         
         Returns:
             Dict com resultado completo do pipeline
         """
-        pipeline_id = str(uuid.uuid4())[:8]
+        pipeline_id = secrets.token_hex(4)
         logger.info(f"[{pipeline_id}] Iniciando pipeline TTS+RVC")
         
         # Obter configurações de emoção
-        emotion_preset = self.EMOTION_PRESETS.get(
-            emotion.lower(),
-            self.EMOTION_PRESETS["neutral"]
-        )
+        emotion_preset = self.EMOTION_PRESETS.get(emotion.lower(), _NEUTRAL)
         
         # Usar valores fornecidos ou do preset
-        actual_speed = speed if speed is not None else emotion_preset["speed"]
-        actual_pitch = pitch_shift if pitch_shift is not None else emotion_preset["pitch_shift"]
+        actual_speed = speed if speed is not None else emotion_preset.speed
+        actual_pitch = pitch_shift if pitch_shift is not None else emotion_preset.pitch_shift
         
         # Auto-detectar idioma
         if not language:
             language = self.language_detector.detect(text)
             logger.info(f"[{pipeline_id}] Idioma detectado: {language}")
         
+        # Com RVC a seguir, o áudio do TTS vai em memória para o RVC
+        # (sem gravar e reler um WAV intermediário)
+        styled = apply_rvc and bool(style_model)
+        
         # Etapa 1: TTS com F5-TTS
         logger.info(f"[{pipeline_id}] Etapa 1: Síntese TTS")
         tts_result = await self.tts.synthesize(
             text=text,
             reference_audio=reference_audio,
             language=language,
-            speed=actual_speed
+            speed=actual_speed,
+            reference_text=reference_text,
+            return_audio=styled
         )
         
         # Se não deve aplicar RVC ou não há modelo de estilo
-        if not apply_rvc or not style_model:
+        if not styled:
+            return self._build_result(
+                pipeline_id, tts_result, None, language, emotion, actual_speed, actual_pitch
+            )
+        
+        # Etapa 2: Estilização com RVC
+        logger.info(f"[{pipeline_id}] Etapa 2: Estilização RVC")
+        
+        if "audio" in tts_result:
+            rvc_result = await self.rvc.convert_audio(
+                tts_result["audio"],
+                tts_result["sample_rate"],
+                voice_model=style_model,
+                pitch_shift=actual_pitch
+            )
+        else:
+            # TTS em modo mock: áudio intermediário já está em disco
+            tts_audio_path = self._url_to_path(tts_result["audio_url"])
+            rvc_result = await self.rvc.convert(
+                input_audio_path=tts_audio_path,
+                voice_model=style_model,
+                pitch_shift=actual_pitch
+            )
+        
+        logger.info(f"[{pipeline_id}] Pipeline concluído")
+        
+        return self._build_result(
+            pipeline_id, tts_result, rvc_result, language, emotion, actual_speed, actual_pitch
+        )
+    
+    @staticmethod
+    def _build_result(
+        pipeline_id: str,
+        tts_result: Dict[str, Any],
+        rvc_result: Optional[Dict[str, Any]],
+        language: str,
+        emotion: str,
+        speed: float,
+        pitch_shift: int
+    ) -> Dict[str, Any]:
+        """
+        Monta o resultado do pipeline a partir das etapas executadas.
+        
+        Args:
+            pipeline_id: Identificador do pipeline
+            tts_result: Resultado da síntese TTS
+            rvc_result: Resultado da conversão RVC (None se não aplicada)
+            language: Idioma usado
+            emotion: Emoção aplicada
+            speed: Velocidade usada
+            pitch_shift: Pitch shift usado
+        
+        Returns:
+            Dict com resultado completo do pipeline
+        """
+        if rvc_result is None:
             return {
                 "pipeline_id": pipeline_id,
                 "audio_url": tts_result["audio_url"],
@@ -240,25 +355,11 @@ class VoicePipeline:
                 "format": tts_result.get("format", "wav"),
                 "language": language,
                 "emotion": emotion,
-                "speed": actual_speed,
+                "speed": speed,
                 "stages_completed": ["tts"],
                 "mock": tts_result.get("mock", False)
             }
         
-        # Etapa 2: Estilização com RVC
-        logger.info(f"[{pipeline_id}] Etapa 2: Estilização RVC")
-        
-        # Converter URL para caminho de arquivo
-        tts_audio_path = self._url_to_path(tts_result["audio_url"])
-        
-        rvc_result = await self.rvc.convert(
-            input_audio_path=tts_audio_path,
-            voice_model=style_model,
-            pitch_shift=actual_pitch
-        )
-        
-        logger.info(f"[{pipeline_id}] Pipeline concluído")
-        
         return {
             "pipeline_id": pipeline_id,
             "audio_url": rvc_result["audio_url"],
@@ -267,10 +368,10 @@ class VoicePipeline:
             "format": rvc_result.get("format", "wav"),
             "language": language,
             "emotion": emotion,
-            "speed": actual_speed,
-            "pitch_shift": actual_pitch,
+            "speed": speed,
+            "pitch_shift": pitch_shift,
             "stages_completed": ["tts", "rvc"],
-            "intermediate_audio": tts_result["audio_url"],
+            "intermediate_audio": tts_result.get("audio_url"),
             "mock": tts_result.get("mock", False) or rvc_result.get("mock", False)
         }
     
@@ -279,62 +380,129 @@ class VoicePipeline:
         items: List[Dict[str, Any]],
         reference_audio: str,
         style_model: Optional[str] = None,
-        max_concurrent: int = 3
+        max_concurrent: int = 3,
+        reference_text: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Processa múltiplos textos em lote.
         
-        Útil para gerar múltiplos áudios de forma eficiente.
+        Útil para gerar múltiplos áudios de forma eficiente. O idioma de
+        cada item é detectado uma única vez e a referência é
+        pré-processada (CPU) antes das sínteses, de forma que a GPU não
+        espera recorte/transcrição; as sínteses simultâneas são agrupadas
+        pelo micro-batcher do TTSService.
+        
+        Com style_model, os áudios do TTS ficam em memória e a etapa RVC
+        roda em uma única chamada a RVCService.convert_batch, cada item
+        com o pitch shift da sua emoção.
         
         Args:
             items: Lista de dicts com 'text' e opcionalmente 'emotion'
             reference_audio: Áudio de referência para todos
             style_model: Modelo de estilo opcional
             max_concurrent: Número máximo de processamentos paralelos
+            reference_text: Transcrição da referência (dispensa o Whisper)
         
         Returns:
             List[Dict]: Resultados para cada item
         """
         semaphore = asyncio.Semaphore(max_concurrent)
+        styled = bool(style_model)
         
-        async def process_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        # Idioma por item (a transcrição da referência depende dele)
+        languages = [
+            item.get("language") or self.language_detector.detect(item.get("text", ""))
+            for item in items
+        ]
+        
+        # Referência pré-processada uma vez por idioma, em paralelo
+        await asyncio.gather(*(
+            self.tts.prefetch_reference(reference_audio, language, reference_text)
+            for language in dict.fromkeys(languages)
+        ))
+        
+        async def synthesize_item(item: Dict[str, Any], language: str) -> Dict[str, Any]:
             async with semaphore:
+                return await self.tts.synthesize(
+                    text=item.get("text", ""),
+                    reference_audio=reference_audio,
+                    language=language,
+                    speed=self._preset_for(item).speed,
+                    reference_text=reference_text,
+                    return_audio=styled
+                )
+        
+        # Etapa 1: TTS de todos os itens
+        tts_results = await asyncio.gather(
+            *(synthesize_item(item, language) for item, language in zip(items, languages)),
+            return_exceptions=True
+        )
+        
+        # Etapa 2: RVC em lote para os áudios em memória; os do TTS mock
+        # já estão em disco e seguem pelo convert() por arquivo
+        rvc_results: Dict[int, Any] = {}
+        if styled:
+            in_memory = [
+                i for i, result in enumerate(tts_results)
+                if not isinstance(result, BaseException) and "audio" in result
+            ]
+            if in_memory:
                 try:
-                    text = item.get("text", "")
-                    emotion = item.get("emotion", "neutral")
-                    
-                    result = await self.text_to_speech_styled(
-                        text=text,
-                        reference_audio=reference_audio,
-                        style_model=style_model,
-                        emotion=emotion
+                    converted = await self.rvc.convert_batch(
+                        [tts_results[i]["audio"] for i in in_memory],
+                        tts_results[in_memory[0]]["sample_rate"],
+                        voice_model=style_model,
+                        pitch_shifts=[self._preset_for(items[i]).pitch_shift for i in in_memory]
                     )
-                    
-                    return {"success": True, "result": result}
-                    
+                    rvc_results.update(zip(in_memory, converted))
                 except Exception as e:
-                    logger.error(f"Erro no batch item: {e}")
-                    return {"success": False, "error": str(e)}
-        
-        # Processar todos os itens
-        tasks = [process_item(item) for item in items]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Converter exceções em resultados de erro
+                    logger.error(f"Erro no RVC em lote: {e}")
+                    rvc_results.update((i, e) for i in in_memory)
+            
+            on_disk = [
+                i for i, result in enumerate(tts_results)
+                if not isinstance(result, BaseException) and "audio" not in result
+            ]
+            converted = await asyncio.gather(*(
+                self.rvc.convert(
+                    input_audio_path=self._url_to_path(tts_results[i]["audio_url"]),
+                    voice_model=style_model,
+                    pitch_shift=self._preset_for(items[i]).pitch_shift
+                )
+                for i in on_disk
+            ), return_exceptions=True)
+            rvc_results.update(zip(on_disk, converted))
+        
+        # Montar resultados na ordem de entrada
         final_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                final_results.append({
-                    "success": False,
-                    "error": str(result),
-                    "index": i
-                })
-            else:
-                result["index"] = i
-                final_results.append(result)
+        for i, (item, language, tts_result) in enumerate(zip(items, languages, tts_results)):
+            rvc_result = rvc_results.get(i)
+            error = next(
+                (r for r in (tts_result, rvc_result) if isinstance(r, BaseException)),
+                None
+            )
+            if error is not None:
+                logger.error(f"Erro no batch item: {error}")
+                final_results.append({"success": False, "error": str(error), "index": i})
+                continue
+            
+            emotion = item.get("emotion", "neutral")
+            preset = self._preset_for(item)
+            final_results.append({
+                "success": True,
+                "result": self._build_result(
+                    secrets.token_hex(4), tts_result, rvc_result,
+                    language, emotion, preset.speed, preset.pitch_shift
+                ),
+                "index": i
+            })
         
         return final_results
     
+    def _preset_for(self, item: Dict[str, Any]) -> EmotionPreset:
+        """Preset de emoção de um item de lote (neutral se desconhecida)."""
+        return self.EMOTION_PRESETS.get(item.get("emotion", "neutral").lower(), _NEUTRAL)
+    
     def _url_to_path(self, url: str) -> str:
         """
         Converte URL de saída para caminho de arquivo.
@@ -358,14 +526,8 @@ class VoicePipeline:
         Returns:
             List[Dict]: Informações sobre cada emoção
         """
-        return [
-            {
-                "name": emotion,
-                "pitch_shift": preset["pitch_shift"],
-                "speed": preset["speed"]
-            }
-            for emotion, preset in self.EMOTION_PRESETS.items()
-        ]
+        # Cópias rasas: o chamador pode alterar os dicts sem afetar o cache
+        return [dict(emotion) for emotion in _AVAILABLE_EMOTIONS]
     
     @property
     def status(self) -> Dict[str, Any]:
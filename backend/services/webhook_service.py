@@ -5,21 +5,47 @@ Permite que usuários registrem URLs para receber notificações
 de eventos como conclusão de processamento, treinos, etc.
 """
 
+import asyncio
+import gzip
 import hashlib
 import hmac
 import json
+import random
+import ssl
+import threading
 import time
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
 import httpx
 
+# Import condicional do orjson (serialização JSON em Rust, retorna bytes)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# HTTP/2 no httpx depende do pacote h2 (httpx[http2])
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# digestmod por nome usa o HMAC do OpenSSL (libcrypto, com SHA-NI quando
+# a CPU suporta); sha256 fora do OpenSSL indica _hashlib ausente
+HMAC_BACKEND = "openssl" if hashlib.sha256.__name__.startswith("openssl_") else "builtin"
+
 
 class WebhookEvent(str, Enum):
     """Tipos de eventos que podem disparar webhooks."""
@@ -34,19 +60,48 @@ class WebhookEvent(str, Enum):
     PAYMENT_RECEIVED = "payment.received"
 
 
+# Prefixo do header X-Webhook-Signature
+_SIGNATURE_PREFIX = "sha256="
+
+# Eventos válidos, calculados uma vez na importação
+_VALID_EVENTS: FrozenSet[str] = frozenset(e.value for e in WebhookEvent)
+
+
 @dataclass
 class WebhookConfig:
     """Configuração de um webhook."""
     id: str
     user_id: int
     url: str
-    events: List[str]
+    events: FrozenSet[str]
     secret: Optional[str] = None
     active: bool = True
     created_at: datetime = field(default_factory=datetime.utcnow)
     last_triggered_at: Optional[datetime] = None
     failure_count: int = 0
+    # Token bucket: envios por segundo (<= 0 desativa) e rajada máxima
+    rate_limit: float = 5.0
+    rate_burst: int = 10
+    # Comprimir (gzip) payloads acima de COMPRESS_MIN_BYTES; o receptor
+    # precisa aceitar Content-Encoding: gzip no corpo da requisição
+    compress: bool = False
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # HMAC já chaveado com o secret; cada envio usa uma cópia
+    _signer: Optional[hmac.HMAC] = field(default=None, init=False, repr=False, compare=False)
+    # Circuit breaker: aberto desde (time.monotonic()) e duração da pausa
+    _circuit_opened_at: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _circuit_cooldown: float = field(default=0.0, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.set_secret(self.secret)
+    
+    def set_secret(self, secret: Optional[str]) -> None:
+        """Define o secret e pré-computa o estado HMAC-SHA256 da chave."""
+        self.secret = secret
+        self._signer = (
+            hmac.new(secret.encode("utf-8"), digestmod="sha256")
+            if secret else None
+        )
 
 
 @dataclass
@@ -73,17 +128,74 @@ class WebhookService:
     - Rate limiting por webhook
     """
     
+    # Entregas mantidas no histórico (global e por webhook)
+    HISTORY_SIZE = 10_000
+    WEBHOOK_HISTORY_SIZE = 1_000
+    
+    # Payloads menores que isso não compensam o gzip
+    COMPRESS_MIN_BYTES = 1024
+    
+    # Bytes lidos da resposta do receptor (o restante é descartado)
+    RESPONSE_BODY_LIMIT = 4096
+    
+    # Circuit breaker: entregas falhas seguidas para abrir o circuito e
+    # pausa inicial/máxima (dobra a cada teste que falha)
+    CIRCUIT_FAILURE_THRESHOLD = 3
+    CIRCUIT_BASE_COOLDOWN = 30.0
+    CIRCUIT_MAX_COOLDOWN = 600.0
+    
     def __init__(
         self,
         max_retries: int = 3,
         retry_delay_seconds: float = 1.0,
-        timeout_seconds: float = 10.0
+        timeout_seconds: float = 10.0,
+        max_concurrency: int = 10
     ):
         self._webhooks: Dict[str, WebhookConfig] = {}
+        # Protege apenas as mutações do registro e dos índices (compostas);
+        # leituras (send_webhook, broadcast_event) não usam o lock
+        self._registry_lock = threading.Lock()
+        # Índices secundários (dicts preservam a ordem de registro)
+        self._by_user: Dict[int, Dict[str, WebhookConfig]] = defaultdict(dict)
+        self._by_user_event: Dict[Tuple[int, str], Dict[str, WebhookConfig]] = defaultdict(dict)
         self._max_retries = max_retries
         self._retry_delay = retry_delay_seconds
         self._timeout = timeout_seconds
-        self._delivery_history: List[WebhookDeliveryResult] = []
+        self._max_concurrency = max_concurrency
+        # Token bucket por webhook: (tokens, último refill em time.monotonic())
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        # Histórico limitado (memória constante), com índice por webhook
+        self._delivery_history: Deque[WebhookDeliveryResult] = deque(maxlen=self.HISTORY_SIZE)
+        self._history_by_webhook: Dict[str, Deque[WebhookDeliveryResult]] = defaultdict(
+            lambda: deque(maxlen=self.WEBHOOK_HISTORY_SIZE)
+        )
+        # Cliente HTTP compartilhado (criado no primeiro envio): mantém
+        # conexões keep-alive entre entregas, sem novo handshake TCP/TLS
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        logger.info(f"Assinatura HMAC-SHA256: {HMAC_BACKEND} ({ssl.OPENSSL_VERSION})")
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Retorna o cliente HTTP compartilhado, criando-o se necessário."""
+        if self._client is None or self._client.is_closed:
+            # HTTP/2 multiplexa entregas simultâneas ao mesmo host em uma
+            # única conexão (ex.: broadcast para vários webhooks do mesmo receptor)
+            self._client = httpx.AsyncClient(
+                http2=H2_AVAILABLE,
+                timeout=self._timeout,
+                limits=httpx.Limits(
+                    max_keepalive_connections=20,
+                    max_connections=100,
+                    keepalive_expiry=30.0
+                )
+            )
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Fecha o cliente HTTP compartilhado (encerramento da aplicação)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     def register_webhook(
         self,
@@ -113,10 +225,13 @@ class WebhookService:
             raise ValueError("URL deve começar com http:// ou https://")
         
         # Validar eventos
-        valid_events = {e.value for e in WebhookEvent}
-        for event in events:
-            if event not in valid_events:
-                raise ValueError(f"Evento inválido: {event}. Válidos: {valid_events}")
+        events = frozenset(events)
+        invalid = events - _VALID_EVENTS
+        if invalid:
+            raise ValueError(
+                f"Evento inválido: {', '.join(sorted(invalid))}. "
+                f"Válidos: {sorted(_VALID_EVENTS)}"
+            )
         
         webhook = WebhookConfig(
             id=webhook_id,
@@ -127,11 +242,16 @@ class WebhookService:
             metadata=metadata or {}
         )
         
-        self._webhooks[webhook_id] = webhook
+        with self._registry_lock:
+            previous = self._webhooks.get(webhook_id)
+            if previous is not None:
+                self._unindex(previous)
+            self._webhooks[webhook_id] = webhook
+            self._index(webhook, webhook.events)
         
         logger.info(
             f"Webhook registrado: id={webhook_id}, user={user_id}, "
-            f"events={events}, url={url[:50]}..."
+            f"events={sorted(events)}, url={url[:50]}..."
         )
         
         return webhook
@@ -142,10 +262,32 @@ class WebhookService:
     
     def get_user_webhooks(self, user_id: int) -> List[WebhookConfig]:
         """Lista todos os webhooks de um usuário."""
-        return [
-            wh for wh in self._webhooks.values()
-            if wh.user_id == user_id
-        ]
+        return list(self._by_user.get(user_id, {}).values())
+    
+    def _index(self, webhook: WebhookConfig, events: Iterable[str]) -> None:
+        """Adiciona o webhook aos índices por usuário e por (usuário, evento)."""
+        self._by_user[webhook.user_id][webhook.id] = webhook
+        for event in events:
+            self._by_user_event[(webhook.user_id, event)][webhook.id] = webhook
+    
+    def _unindex(self, webhook: WebhookConfig) -> None:
+        """Remove o webhook de todos os índices."""
+        self._unindex_events(webhook, webhook.events)
+        user_webhooks = self._by_user.get(webhook.user_id)
+        if user_webhooks is not None:
+            user_webhooks.pop(webhook.id, None)
+            if not user_webhooks:
+                del self._by_user[webhook.user_id]
+    
+    def _unindex_events(self, webhook: WebhookConfig, events: Iterable[str]) -> None:
+        """Remove o webhook do índice (usuário, evento) dos eventos dados."""
+        for event in events:
+            key = (webhook.user_id, event)
+            subscribers = self._by_user_event.get(key)
+            if subscribers is not None:
+                subscribers.pop(webhook.id, None)
+                if not subscribers:
+                    del self._by_user_event[key]
     
     def delete_webhook(self, webhook_id: str) -> bool:
         """
@@ -157,8 +299,14 @@ class WebhookService:
         Returns:
             bool: True se removido, False se não encontrado
         """
-        if webhook_id in self._webhooks:
-            del self._webhooks[webhook_id]
+        with self._registry_lock:
+            webhook = self._webhooks.pop(webhook_id, None)
+            if webhook is not None:
+                self._unindex(webhook)
+                self._history_by_webhook.pop(webhook_id, None)
+                self._buckets.pop(webhook_id, None)
+        
+        if webhook is not None:
             logger.info(f"Webhook removido: {webhook_id}")
             return True
         return False
@@ -191,33 +339,72 @@ class WebhookService:
         if url is not None:
             webhook.url = url
         if events is not None:
-            webhook.events = events
+            new_events = frozenset(events)
+            with self._registry_lock:
+                self._unindex_events(webhook, webhook.events - new_events)
+                self._index(webhook, new_events - webhook.events)
+                webhook.events = new_events
         if secret is not None:
-            webhook.secret = secret
+            webhook.set_secret(secret)
         if active is not None:
             webhook.active = active
         
         logger.info(f"Webhook atualizado: {webhook_id}")
         return webhook
     
-    def _generate_signature(self, payload: str, secret: str) -> str:
+    def _generate_signature(self, payload: bytes, webhook: WebhookConfig) -> str:
         """
         Gera assinatura HMAC-SHA256 para o payload.
         
+        Copia o HMAC pré-chaveado do webhook em vez de refazer o key
+        schedule (ipad/opad) a cada envio.
+        
         Args:
-            payload: Corpo da requisição em JSON
-            secret: Chave secreta do webhook
+            payload: Corpo da requisição em JSON (UTF-8)
+            webhook: Webhook com secret configurado
         
         Returns:
             str: Assinatura no formato "sha256=<hash>"
         """
-        signature = hmac.new(
-            secret.encode("utf-8"),
-            payload.encode("utf-8"),
-            hashlib.sha256
-        ).hexdigest()
+        signer = webhook._signer.copy()
+        signer.update(payload)
         
-        return f"sha256={signature}"
+        return _SIGNATURE_PREFIX + signer.hexdigest()
+    
+    def verify_signature(self, payload: bytes, signature: str, webhook_id: str) -> bool:
+        """
+        Verifica uma assinatura gerada para o webhook.
+        
+        A comparação usa hmac.compare_digest (tempo constante), sem
+        vazar por timing quantos caracteres coincidem.
+        
+        Args:
+            payload: Corpo exato da requisição
+            signature: Valor do header X-Webhook-Signature
+            webhook_id: ID do webhook
+        
+        Returns:
+            bool: True se a assinatura confere
+        """
+        webhook = self._webhooks.get(webhook_id)
+        if webhook is None or webhook._signer is None:
+            return False
+        
+        expected = self._generate_signature(payload, webhook)
+        return hmac.compare_digest(expected.encode("ascii"), signature.encode("ascii", "replace"))
+    
+    @staticmethod
+    def _dump_payload(payload: Dict[str, Any]) -> bytes:
+        """
+        Serializa o payload em JSON UTF-8.
+        
+        Usa orjson quando instalado (bytes direto, sem .encode()); o json
+        da stdlib fica como fallback. Tipos não serializáveis viram str
+        nos dois casos.
+        """
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(payload, default=str).encode("utf-8")
     
     async def send_webhook(
         self,
@@ -262,6 +449,25 @@ class WebhookService:
                 error=f"Evento {event} não configurado para este webhook"
             )
         
+        # Circuito aberto: falha imediata, sem gastar retries com um
+        # endpoint fora do ar. Após a pausa, uma única entrega de teste
+        # (half-open) decide se o circuito fecha ou reabre
+        max_attempts = self._max_retries
+        half_open = webhook._circuit_opened_at is not None
+        if half_open:
+            now = time.monotonic()
+            if now - webhook._circuit_opened_at < webhook._circuit_cooldown:
+                return WebhookDeliveryResult(
+                    success=False,
+                    webhook_id=webhook_id,
+                    event=event,
+                    error="circuit_open",
+                    attempts=0
+                )
+            # Rearmar a pausa: entregas concorrentes não viram testes extras
+            webhook._circuit_opened_at = now
+            max_attempts = 1
+        
         # Construir payload
         payload = {
             "event": event,
@@ -269,7 +475,8 @@ class WebhookService:
             "webhook_id": webhook_id,
             "data": data
         }
-        payload_json = json.dumps(payload, default=str)
+        # Codificado uma única vez: os mesmos bytes são assinados e enviados
+        payload_bytes = self._dump_payload(payload)
         
         # Preparar headers
         headers = {
@@ -279,9 +486,14 @@ class WebhookService:
             "X-Webhook-Id": webhook_id
         }
         
-        # Adicionar assinatura HMAC se secret configurado
-        if webhook.secret:
-            signature = self._generate_signature(payload_json, webhook.secret)
+        if webhook.compress and len(payload_bytes) >= self.COMPRESS_MIN_BYTES:
+            payload_bytes = gzip.compress(payload_bytes, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        
+        # Adicionar assinatura HMAC se secret configurado (sobre os bytes
+        # enviados, já comprimidos quando for o caso)
+        if webhook._signer is not None:
+            signature = self._generate_signature(payload_bytes, webhook)
             headers["X-Webhook-Signature"] = signature
         
         # Tentar enviar com retry
@@ -289,65 +501,89 @@ class WebhookService:
         attempts = 0
         start_time = time.time()
         
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            for attempt in range(self._max_retries):
-                attempts = attempt + 1
+        client = self._get_client()
+        
+        for attempt in range(max_attempts):
+            attempts = attempt + 1
+            await self._acquire_token(webhook)
+            
+            try:
+                # Streaming: o corpo da resposta é lido só até
+                # RESPONSE_BODY_LIMIT e decodificado apenas em caso de erro
+                async with client.stream(
+                    "POST",
+                    webhook.url,
+                    content=payload_bytes,
+                    headers=headers
+                ) as response:
+                    body = await self._read_body(response)
                 
-                try:
-                    response = await client.post(
-                        webhook.url,
-                        content=payload_json,
-                        headers=headers
-                    )
-                    
-                    duration_ms = int((time.time() - start_time) * 1000)
+                duration_ms = int((time.time() - start_time) * 1000)
+                
+                # Considerar sucesso para códigos 2xx
+                if 200 <= response.status_code < 300:
+                    webhook.last_triggered_at = datetime.utcnow()
+                    webhook.failure_count = 0
+                    webhook._circuit_opened_at = None
+                    webhook._circuit_cooldown = 0.0
                     
-                    # Considerar sucesso para códigos 2xx
-                    if 200 <= response.status_code < 300:
-                        webhook.last_triggered_at = datetime.utcnow()
-                        webhook.failure_count = 0
-                        
-                        result = WebhookDeliveryResult(
-                            success=True,
-                            webhook_id=webhook_id,
-                            event=event,
-                            status_code=response.status_code,
-                            response_body=response.text[:500],
-                            attempts=attempts,
-                            duration_ms=duration_ms
-                        )
-                        
-                        self._delivery_history.append(result)
-                        logger.info(
-                            f"Webhook entregue: {webhook_id}, event={event}, "
-                            f"status={response.status_code}, attempts={attempts}"
-                        )
-                        
-                        return result
+                    result = WebhookDeliveryResult(
+                        success=True,
+                        webhook_id=webhook_id,
+                        event=event,
+                        status_code=response.status_code,
+                        attempts=attempts,
+                        duration_ms=duration_ms
+                    )
                     
-                    # Erro do servidor - tentar novamente
-                    last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+                    self._record_delivery(result)
+                    logger.info(
+                        f"Webhook entregue: {webhook_id}, event={event}, "
+                        f"status={response.status_code}, attempts={attempts}"
+                    )
                     
-                except httpx.TimeoutException:
-                    last_error = "Timeout na requisição"
-                except httpx.RequestError as e:
-                    last_error = f"Erro de conexão: {str(e)}"
-                except Exception as e:
-                    last_error = f"Erro inesperado: {str(e)}"
+                    return result
                 
-                # Aguardar antes de retry (backoff exponencial)
-                if attempt < self._max_retries - 1:
-                    delay = self._retry_delay * (2 ** attempt)
-                    logger.warning(
-                        f"Webhook falhou (tentativa {attempts}): {last_error}. "
-                        f"Retry em {delay}s..."
-                    )
-                    await self._async_sleep(delay)
+                # Erro do servidor - tentar novamente
+                text = body.decode(response.encoding or "utf-8", errors="replace")
+                last_error = f"HTTP {response.status_code}: {text[:200]}"
+                
+            except httpx.TimeoutException:
+                last_error = "Timeout na requisição"
+            except httpx.RequestError as e:
+                last_error = f"Erro de conexão: {str(e)}"
+            except Exception as e:
+                last_error = f"Erro inesperado: {str(e)}"
+            
+            # Aguardar antes de retry (backoff exponencial com jitter, para
+            # que entregas que falharam juntas não voltem todas ao mesmo
+            # tempo). A espera não segura conexão: o pool é compartilhado.
+            if attempt < max_attempts - 1:
+                delay = self._retry_delay * (2 ** attempt) * (0.5 + random.random())
+                logger.warning(
+                    f"Webhook falhou (tentativa {attempts}): {last_error}. "
+                    f"Retry em {delay:.2f}s..."
+                )
+                await asyncio.sleep(delay)
         
         # Todas as tentativas falharam
         duration_ms = int((time.time() - start_time) * 1000)
         webhook.failure_count += 1
         
+        # Abrir (ou reabrir, com pausa dobrada) o circuito
+        if half_open:
+            webhook._circuit_opened_at = time.monotonic()
+            webhook._circuit_cooldown = min(
+                webhook._circuit_cooldown * 2, self.CIRCUIT_MAX_COOLDOWN
+            )
+        elif webhook.failure_count >= self.CIRCUIT_FAILURE_THRESHOLD:
+            webhook._circuit_opened_at = time.monotonic()
+            webhook._circuit_cooldown = self.CIRCUIT_BASE_COOLDOWN
+            logger.warning(
+                f"Circuito aberto para webhook {webhook_id} "
+                f"por {self.CIRCUIT_BASE_COOLDOWN:.0f}s"
+            )
+        
         # Desativar webhook após muitas falhas
         if webhook.failure_count >= 10:
             webhook.active = False
@@ -362,7 +598,7 @@ class WebhookService:
             duration_ms=duration_ms
         )
         
-        self._delivery_history.append(result)
+        self._record_delivery(result)
         logger.error(
             f"Webhook falhou permanentemente: {webhook_id}, event={event}, "
             f"error={last_error}, attempts={attempts}"
@@ -370,10 +606,41 @@ class WebhookService:
         
         return result
     
-    async def _async_sleep(self, seconds: float):
-        """Sleep assíncrono para retry."""
-        import asyncio
-        await asyncio.sleep(seconds)
+    async def _read_body(self, response: httpx.Response) -> bytes:
+        """
+        Lê no máximo RESPONSE_BODY_LIMIT bytes do corpo da resposta.
+        
+        Respostas pequenas são lidas por inteiro (a conexão volta ao
+        pool); respostas maiores são interrompidas sem materializar o
+        corpo todo em memória.
+        """
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.RESPONSE_BODY_LIMIT:
+                break
+        return b"".join(chunks)[:self.RESPONSE_BODY_LIMIT]
+    
+    async def _acquire_token(self, webhook: WebhookConfig) -> None:
+        """
+        Consome um token do bucket do webhook, aguardando se necessário.
+        
+        O token é reservado antes da espera (saldo negativo): chamadas
+        concorrentes formam fila sem lock, pois o event loop não
+        intercala o trecho síncrono.
+        """
+        if webhook.rate_limit <= 0:
+            return
+        
+        now = time.monotonic()
+        tokens, last = self._buckets.get(webhook.id, (float(webhook.rate_burst), now))
+        tokens = min(float(webhook.rate_burst), tokens + (now - last) * webhook.rate_limit) - 1
+        self._buckets[webhook.id] = (tokens, now)
+        
+        if tokens < 0:
+            await asyncio.sleep(-tokens / webhook.rate_limit)
     
     async def broadcast_event(
         self,
@@ -384,6 +651,10 @@ class WebhookService:
         """
         Envia evento para todos os webhooks do usuário configurados para ele.
         
+        As entregas são independentes e rodam em paralelo (no máximo
+        max_concurrency simultâneas): a latência total é a do endpoint
+        mais lento, não a soma de todos.
+        
         Args:
             user_id: ID do usuário
             event: Tipo do evento
@@ -392,14 +663,20 @@ class WebhookService:
         Returns:
             Lista de resultados de entrega
         """
-        results = []
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        
+        async def deliver(webhook: WebhookConfig) -> WebhookDeliveryResult:
+            async with semaphore:
+                return await self.send_webhook(webhook.id, event, data)
         
-        for webhook in self.get_user_webhooks(user_id):
-            if webhook.active and event in webhook.events:
-                result = await self.send_webhook(webhook.id, event, data)
-                results.append(result)
+        # Apenas os inscritos no evento (índice), sem varrer os demais webhooks
+        subscribers = list(self._by_user_event.get((user_id, event), {}).values())
         
-        return results
+        return list(await asyncio.gather(*(
+            deliver(webhook)
+            for webhook in subscribers
+            if webhook.active
+        )))
     
     def get_delivery_history(
         self,
@@ -416,12 +693,20 @@ class WebhookService:
         Returns:
             Lista de resultados de entrega
         """
-        history = self._delivery_history
-        
         if webhook_id:
-            history = [r for r in history if r.webhook_id == webhook_id]
-        
-        return history[-limit:]
+            history = self._history_by_webhook.get(webhook_id, ())
+        else:
+            history = self._delivery_history
+        
+        # Últimos `limit` itens sem copiar o histórico inteiro
+        recent = list(islice(reversed(history), limit))
+        recent.reverse()
+        return recent
+    
+    def _record_delivery(self, result: WebhookDeliveryResult) -> None:
+        """Registra uma entrega no histórico global e no do webhook."""
+        self._delivery_history.append(result)
+        self._history_by_webhook[result.webhook_id].append(result)
 
 
 # Singleton do serviço
@@ -4,6 +4,7 @@ Módulo de utilitários.
 Contém funções auxiliares, logging e tratamento de exceções.
 """
 
+from backend.utils.audio import write_silence_wav
 from backend.utils.logger import get_logger, setup_logging
 from backend.utils.exceptions import (
     VoiceCloneException,
@@ -29,4 +30,5 @@ __all__ = [
     "validate_email",
     "validate_language",
     "validate_audio_format",
+    "write_silence_wav",
 ]
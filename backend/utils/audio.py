@@ -0,0 +1,64 @@
+"""
+Utilitários de áudio.
+
+Funções auxiliares de escrita de WAV compartilhadas pelos serviços
+de TTS e RVC e pelo streaming de áudio.
+"""
+
+import struct
+import wave
+
+# Bloco fixo de silêncio (64KB), alocado uma única vez por processo
+_SILENCE_CHUNK = bytes(65536)
+
+
+def write_silence_wav(path: str, samples: int, sample_rate: int) -> None:
+    """
+    Grava um WAV mono PCM 16-bit silencioso.
+
+    Escreve sempre o mesmo bloco de zeros: memória constante e nenhuma
+    alocação proporcional à duração (300s = ~14MB de zeros).
+
+    Args:
+        path: Caminho do arquivo de saída
+        samples: Número de amostras
+        sample_rate: Taxa de amostragem
+    """
+    with wave.open(str(path), 'w') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)  # 16-bit
+        wav_file.setframerate(sample_rate)
+        # Header com o número final de frames evita reescrita no close
+        wav_file.setnframes(samples)
+
+        remaining = samples * 2
+        while remaining > 0:
+            size = min(remaining, len(_SILENCE_CHUNK))
+            wav_file.writeframesraw(_SILENCE_CHUNK[:size])
+            remaining -= size
+
+
+# Tamanho do header WAV (RIFF + fmt + data) gerado por wav_stream_header
+WAV_HEADER_SIZE = 44
+
+
+def wav_stream_header(sample_rate: int) -> bytes:
+    """
+    Header WAV mono PCM 16-bit para áudio transmitido em streaming.
+
+    O tamanho total ainda não é conhecido: os campos de tamanho usam
+    0xFFFFFFFF, convenção aceita por players e navegadores para WAV
+    de comprimento indefinido.
+
+    Args:
+        sample_rate: Taxa de amostragem
+
+    Returns:
+        bytes: Header de WAV_HEADER_SIZE bytes
+    """
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", 0xFFFFFFFF
+    )
@@ -30,9 +30,20 @@ class VoiceCloneException(Exception):
     ):
         self.message = message
         self.code = code
-        self.details = details or {}
+        if details:
+            self.details = details
         super().__init__(self.message)
     
+    def __getattr__(self, name: str) -> Any:
+        # details vazio só é alocado no primeiro acesso; depois é um
+        # atributo comum (mutável, por instância) como antes
+        if name == "details":
+            self.details = {}
+            return self.details
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
+    
     def to_dict(self) -> dict[str, Any]:
         """Converte exceção para dicionário."""
         return {
@@ -42,7 +53,30 @@ class VoiceCloneException(Exception):
         }
 
 
-class AudioValidationError(VoiceCloneException, HTTPException):
+class _DomainHTTPException(VoiceCloneException, HTTPException):
+    """
+    Base das exceções de domínio que também são respostas HTTP.
+    
+    Cada subclasse declara apenas ``status_code`` e ``code`` como
+    constantes de classe. Os atributos de VoiceCloneException e de
+    HTTPException são atribuídos aqui de uma só vez, sem encadear os
+    dois ``__init__`` (e o ``detail`` duplicado) a cada raise.
+    """
+    
+    status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR
+    code: str = "VOICE_CLONE_ERROR"
+    
+    def __init__(self, message: str, details: Optional[dict[str, Any]] = None):
+        self.message = message
+        if details:
+            self.details = details
+        # Atributos esperados pelo handler de HTTPException (mesmo objeto str)
+        self.detail = message
+        self.headers = None
+        Exception.__init__(self, message)
+
+
+class AudioValidationError(_DomainHTTPException):
     """
     Erro de validação de áudio.
     
@@ -53,21 +87,11 @@ class AudioValidationError(VoiceCloneException, HTTPException):
         raise AudioValidationError("Formato WAV obrigatório")
     """
     
-    def __init__(self, message: str, details: Optional[dict] = None):
-        VoiceCloneException.__init__(
-            self,
-            message=message,
-            code="AUDIO_VALIDATION_ERROR",
-            details=details
-        )
-        HTTPException.__init__(
-            self,
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=message
-        )
+    status_code = status.HTTP_400_BAD_REQUEST
+    code = "AUDIO_VALIDATION_ERROR"
 
 
-class InsufficientCreditsError(VoiceCloneException, HTTPException):
+class InsufficientCreditsError(_DomainHTTPException):
     """
     Erro de créditos insuficientes.
     
@@ -79,71 +103,48 @@ class InsufficientCreditsError(VoiceCloneException, HTTPException):
         required: Créditos necessários
     """
     
+    status_code = status.HTTP_402_PAYMENT_REQUIRED
+    code = "INSUFFICIENT_CREDITS"
+    
     def __init__(self, available: float, required: float):
-        message = (
+        super().__init__(
             f"Créditos insuficientes. "
-            f"Disponível: {available:.2f}, Necessário: {required:.2f}"
-        )
-        VoiceCloneException.__init__(
-            self,
-            message=message,
-            code="INSUFFICIENT_CREDITS",
-            details={"available": available, "required": required}
-        )
-        HTTPException.__init__(
-            self,
-            status_code=status.HTTP_402_PAYMENT_REQUIRED,
-            detail=message
+            f"Disponível: {available:.2f}, Necessário: {required:.2f}",
+            {"available": available, "required": required}
         )
         self.available = available
         self.required = required
 
 
-class UserNotFoundError(VoiceCloneException, HTTPException):
+class UserNotFoundError(_DomainHTTPException):
     """
     Erro de usuário não encontrado.
     
     Levantado quando operação referencia usuário inexistente.
     """
     
+    status_code = status.HTTP_404_NOT_FOUND
+    code = "USER_NOT_FOUND"
+    
     def __init__(self, user_id: int):
-        message = f"Usuário não encontrado: {user_id}"
-        VoiceCloneException.__init__(
-            self,
-            message=message,
-            code="USER_NOT_FOUND",
-            details={"user_id": user_id}
-        )
-        HTTPException.__init__(
-            self,
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=message
-        )
+        super().__init__(f"Usuário não encontrado: {user_id}", {"user_id": user_id})
 
 
-class UserAlreadyExistsError(VoiceCloneException, HTTPException):
+class UserAlreadyExistsError(_DomainHTTPException):
     """
     Erro de usuário já existente.
     
     Levantado na tentativa de criar usuário com email duplicado.
     """
     
+    status_code = status.HTTP_409_CONFLICT
+    code = "USER_ALREADY_EXISTS"
+    
     def __init__(self, email: str):
-        message = f"Usuário já cadastrado com este email: {email}"
-        VoiceCloneException.__init__(
-            self,
-            message=message,
-            code="USER_ALREADY_EXISTS",
-            details={"email": email}
-        )
-        HTTPException.__init__(
-            self,
-            status_code=status.HTTP_409_CONFLICT,
-            detail=message
-        )
+        super().__init__(f"Usuário já cadastrado com este email: {email}", {"email": email})
 
 
-class VoiceProfileNotFoundError(VoiceCloneException, HTTPException):
+class VoiceProfileNotFoundError(_DomainHTTPException):
     """
     Erro de perfil de voz não encontrado.
     
@@ -151,81 +152,50 @@ class VoiceProfileNotFoundError(VoiceCloneException, HTTPException):
     ou sem permissão de acesso.
     """
     
+    status_code = status.HTTP_404_NOT_FOUND
+    code = "VOICE_PROFILE_NOT_FOUND"
+    
     def __init__(self, profile_id: int):
-        message = f"Perfil de voz não encontrado: {profile_id}"
-        VoiceCloneException.__init__(
-            self,
-            message=message,
-            code="VOICE_PROFILE_NOT_FOUND",
-            details={"profile_id": profile_id}
-        )
-        HTTPException.__init__(
-            self,
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=message
-        )
+        super().__init__(f"Perfil de voz não encontrado: {profile_id}", {"profile_id": profile_id})
 
 
-class ModelNotLoadedError(VoiceCloneException, HTTPException):
+class ModelNotLoadedError(_DomainHTTPException):
     """
     Erro de modelo ML não carregado.
     
     Levantado quando operação requer modelo que não está em memória.
     """
     
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    code = "MODEL_NOT_LOADED"
+    
     def __init__(self, model_name: str):
-        message = f"Modelo não carregado: {model_name}"
-        VoiceCloneException.__init__(
-            self,
-            message=message,
-            code="MODEL_NOT_LOADED",
-            details={"model": model_name}
-        )
-        HTTPException.__init__(
-            self,
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=message
-        )
+        super().__init__(f"Modelo não carregado: {model_name}", {"model": model_name})
 
 
-class RateLimitExceededError(VoiceCloneException, HTTPException):
+class RateLimitExceededError(_DomainHTTPException):
     """
     Erro de rate limit excedido.
     
     Levantado quando usuário excede limite de requisições.
     """
     
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    code = "RATE_LIMIT_EXCEEDED"
+    
     def __init__(self, limit: int, period: int):
-        message = f"Limite de requisições excedido: {limit} por {period}s"
-        VoiceCloneException.__init__(
-            self,
-            message=message,
-            code="RATE_LIMIT_EXCEEDED",
-            details={"limit": limit, "period_seconds": period}
-        )
-        HTTPException.__init__(
-            self,
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=message
+        super().__init__(
+            f"Limite de requisições excedido: {limit} por {period}s",
+            {"limit": limit, "period_seconds": period}
         )
 
 
-class ProcessingError(VoiceCloneException, HTTPException):
+class ProcessingError(_DomainHTTPException):
     """
     Erro genérico de processamento.
     
     Levantado quando ocorre erro durante processamento de áudio ou ML.
     """
     
-    def __init__(self, message: str, details: Optional[dict] = None):
-        VoiceCloneException.__init__(
-            self,
-            message=message,
-            code="PROCESSING_ERROR",
-            details=details
-        )
-        HTTPException.__init__(
-            self,
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=message
-        )
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    code = "PROCESSING_ERROR"
@@ -8,21 +8,115 @@ Inclui middleware para logging de requisições HTTP com
 contexto automaticamente adicionado.
 """
 
+import atexit
+import io
 import logging
+import os
+import queue
 import sys
+import threading
 import time
-import uuid
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
 
 import structlog
 from structlog.types import Processor
 
 from backend.config import get_settings
 
+# Import condicional do orjson (serializador JSON em Rust, retorna bytes)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 # Context var para armazenar request_id por requisição
 request_id_ctx: ContextVar[str] = ContextVar('request_id', default='')
 
+# Stdout com buffer dos logs de produção (criado uma vez por processo)
+_log_stream: Optional[io.BufferedWriter] = None
+
+# Thread que renderiza e escreve os logs enfileirados
+_log_listener: Optional[QueueListener] = None
+
+
+class _DeferredFlushStream:
+    """
+    Encaminha escritas para um stream com buffer, ignorando flush().
+    
+    O StreamHandler chama flush() a cada registro; aqui o flush real
+    fica com a thread periódica e o atexit, de forma que várias linhas
+    saem em uma única escrita. Aceita str e bytes.
+    """
+    
+    def __init__(self, stream: io.BufferedWriter):
+        self._stream = stream
+    
+    def write(self, data: Any) -> int:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return self._stream.write(data)
+    
+    def flush(self) -> None:
+        pass
+
+
+def _buffered_stdout(buffer_size: int, flush_interval: float) -> Optional[io.BufferedWriter]:
+    """
+    Retorna stdout com buffer de `buffer_size` bytes e flush periódico.
+    
+    Uma thread daemon faz flush a cada `flush_interval` segundos (logs
+    nunca ficam retidos por mais que isso) e o atexit descarrega o
+    restante no encerramento.
+    
+    Returns:
+        Stream com buffer, ou None se stdout não tiver descritor de arquivo
+    """
+    global _log_stream
+    
+    if _log_stream is None:
+        try:
+            # closefd=False: o descritor continua sendo do sys.stdout
+            raw = io.FileIO(sys.stdout.fileno(), "wb", closefd=False)
+        except (AttributeError, OSError, ValueError):
+            return None
+        _log_stream = io.BufferedWriter(raw, buffer_size=buffer_size)
+        stream = _log_stream
+        stop = threading.Event()
+        
+        def flush_periodically() -> None:
+            while not stop.wait(flush_interval):
+                stream.flush()
+        
+        def flush_at_exit() -> None:
+            stop.set()
+            stream.flush()
+        
+        threading.Thread(target=flush_periodically, name="log-flush", daemon=True).start()
+        atexit.register(flush_at_exit)
+    
+    return _log_stream
+
+
+class _PassthroughQueueHandler(QueueHandler):
+    """
+    QueueHandler que enfileira o LogRecord sem formatá-lo.
+    
+    O QueueHandler padrão formata a mensagem no prepare(), ou seja, na
+    thread que loga; aqui a renderização fica inteira com o listener.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _orjson_dumps(obj: Any, **kwargs: Any) -> str:
+    """Serializador orjson para o JSONRenderer (o StreamHandler espera str)."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, **kwargs).decode("utf-8")
+
 
 def setup_logging() -> None:
     """
@@ -30,7 +124,14 @@ def setup_logging() -> None:
     
     Em modo debug: logs coloridos e formatados para terminal.
     Em produção: logs em JSON para processamento por ferramentas.
+    
+    Os eventos (do structlog e de bibliotecas via logging) passam por
+    uma fila: quem loga só executa os processadores leves e enfileira;
+    a renderização e a escrita em stdout ficam na thread do
+    QueueListener, fora do event loop.
     """
+    global _log_listener
+    
     settings = get_settings()
     
     # Definir nível de log
@@ -41,38 +142,79 @@ def setup_logging() -> None:
         structlog.contextvars.merge_contextvars,
         add_request_id,  # Adiciona request_id automaticamente
         structlog.processors.add_log_level,
-        structlog.processors.StackInfoRenderer(),
-        structlog.dev.set_exc_info,
+    ]
+    if settings.debug:
+        # Só em desenvolvimento: stack_info=True e exc_info implícito.
+        # Em produção, logger.exception() já define exc_info=True.
+        shared_processors += [
+            structlog.processors.StackInfoRenderer(),
+            structlog.dev.set_exc_info,
+        ]
+    shared_processors += [
         structlog.processors.TimeStamper(fmt="iso"),
+        capture_exc_info,
     ]
     
     if settings.debug:
         # Desenvolvimento: logs coloridos no terminal
-        processors: list[Processor] = shared_processors + [
-            structlog.dev.ConsoleRenderer(colors=True)
+        renderers: list[Processor] = [structlog.dev.ConsoleRenderer(colors=True)]
+    elif ORJSON_AVAILABLE:
+        # Produção: logs em JSON via orjson
+        renderers = [
+            structlog.processors.dict_tracebacks,
+            structlog.processors.JSONRenderer(serializer=_orjson_dumps)
         ]
     else:
         # Produção: logs em JSON
-        processors = shared_processors + [
+        renderers = [
             structlog.processors.dict_tracebacks,
             structlog.processors.JSONRenderer()
         ]
     
-    # Configurar structlog
+    # Produção: stdout com buffer, evitando uma syscall write() por linha
+    stream: Any = None
+    if not settings.debug and settings.log_buffer_size > 0:
+        buffered = _buffered_stdout(
+            settings.log_buffer_size, settings.log_flush_interval_ms / 1000
+        )
+        if buffered is not None:
+            stream = _DeferredFlushStream(buffered)
+    
+    # Configurar structlog: eventos seguem como dict para o logging padrão
     structlog.configure(
-        processors=processors,
+        processors=shared_processors + [
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter
+        ],
         wrapper_class=structlog.make_filtering_bound_logger(log_level),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
     )
     
-    # Configurar logging padrão do Python para bibliotecas externas
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=log_level,
-    )
+    # Renderização na thread do listener (inclui logs de bibliotecas externas)
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=shared_processors,
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            *renderers,
+        ],
+    ))
+    
+    if _log_listener is not None:
+        _log_listener.stop()
+    else:
+        atexit.register(_stop_log_listener)
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, handler)
+    _log_listener.start()
+    
+    root_logger = logging.getLogger()
+    for existing in root_logger.handlers[:]:
+        root_logger.removeHandler(existing)
+    root_logger.addHandler(_PassthroughQueueHandler(log_queue))
+    root_logger.setLevel(log_level)
     
     # Silenciar logs verbosos de bibliotecas
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -81,6 +223,24 @@ def setup_logging() -> None:
     )
 
 
+def _stop_log_listener() -> None:
+    """Escreve os logs ainda na fila e encerra o listener."""
+    if _log_listener is not None:
+        _log_listener.stop()
+
+
+def capture_exc_info(logger: Any, method_name: str, event_dict: dict) -> dict:
+    """
+    Processador que troca exc_info=True pela exceção corrente.
+    
+    A renderização roda na thread do QueueListener, que não enxerga o
+    sys.exc_info() de quem logou.
+    """
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
 def add_request_id(logger: Any, method_name: str, event_dict: dict) -> dict:
     """
     Processador que adiciona request_id ao evento de log se disponível.
@@ -118,30 +278,40 @@ class RequestLoggingMiddleware:
     def __init__(self, app):
         self.app = app
         self.logger = get_logger("http")
+        # Métodos de log resolvidos uma vez, fora do caminho da requisição
+        self._info = self.logger.info
+        self._warn = self.logger.warning
+        self._error = self.logger.error
     
     async def __call__(self, scope, receive, send):
-        if scope["type"] != "http":
-            return await self.app(scope, receive, send)
-        
-        # Gera request_id único
-        req_id = str(uuid.uuid4())[:8]
-        request_id_ctx.set(req_id)
+        # lifespan/websocket seguem direto para a aplicação
+        if scope["type"] == "http":
+            return await self._handle(scope, receive, send)
+        return await self.app(scope, receive, send)
+    
+    async def _handle(self, scope, receive, send):
+        """Loga e cronometra uma requisição HTTP."""
+        # Gera request_id único (4 bytes aleatórios = 8 caracteres hex, sem montar um UUID)
+        req_id = os.urandom(4).hex()
+        # O token restaura o contexto ao final: o ID não vaza da requisição
+        token = request_id_ctx.set(req_id)
         
         # Extrai informações da requisição
         method = scope.get("method", "?")
         path = scope.get("path", "?")
-        query = scope.get("query_string", b"").decode()
-        client = scope.get("client", ("?", 0))
         
-        # Log de entrada
-        start_time = time.time()
-        self.logger.info(
-            "Requisição iniciada",
-            method=method,
-            path=path,
-            query=query[:100] if query else None,
-            client_ip=client[0] if client else None,
-        )
+        # Log de entrada: query e cliente só são extraídos se INFO estiver ativo
+        start_time = time.perf_counter_ns()
+        if self.logger.is_enabled_for(logging.INFO):
+            query = scope.get("query_string", b"")[:100].decode("latin-1")
+            client = scope.get("client")
+            self._info(
+                "Requisição iniciada",
+                method=method,
+                path=path,
+                query=query or None,
+                client_ip=client[0] if client else None,
+            )
         
         # Intercepta response para capturar status_code
         status_code = 0
@@ -150,33 +320,37 @@ class RequestLoggingMiddleware:
             nonlocal status_code
             if message["type"] == "http.response.start":
                 status_code = message.get("status", 0)
+                # Devolve o request_id ao cliente para correlação com os logs
+                message["headers"] = [
+                    *message.get("headers", ()), (b"x-request-id", req_id.encode())
+                ]
             return await send(message)
         
         try:
             await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # Log de erro
-            duration = time.time() - start_time
-            self.logger.error(
+            self._error(
                 "Requisição falhou",
                 method=method,
                 path=path,
-                duration_ms=round(duration * 1000, 2),
+                duration_ms=(time.perf_counter_ns() - start_time) / 1_000_000,
                 error=str(e),
                 error_type=type(e).__name__,
             )
             raise
         else:
             # Log de sucesso
-            duration = time.time() - start_time
-            log_method = self.logger.info if status_code < 400 else self.logger.warning
+            log_method = self._info if status_code < 400 else self._warn
             log_method(
                 "Requisição concluída",
                 method=method,
                 path=path,
                 status_code=status_code,
-                duration_ms=round(duration * 1000, 2),
+                duration_ms=(time.perf_counter_ns() - start_time) / 1_000_000,
             )
+        finally:
+            request_id_ctx.reset(token)
 
 
 class LoggerAdapter:
@@ -186,40 +360,30 @@ class LoggerAdapter:
     Permite adicionar contexto permanente ao logger,
     útil para requisições ou operações longas.
     
+    Os métodos de log (debug, info, warning, ...) não são redefinidos:
+    o acesso é repassado direto ao BoundLogger, sem uma chamada extra
+    por log.
+    
     Example:
         logger = LoggerAdapter(get_logger(__name__))
         logger.bind(request_id="abc-123", user_id=1)
         logger.info("Processando")  # Inclui request_id e user_id
     """
     
+    __slots__ = ("_logger",)
+    
     def __init__(self, logger: structlog.BoundLogger):
         self._logger = logger
-        self._context: dict[str, Any] = {}
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._logger, name)
     
     def bind(self, **kwargs: Any) -> "LoggerAdapter":
         """Adiciona contexto ao logger."""
-        self._context.update(kwargs)
         self._logger = self._logger.bind(**kwargs)
         return self
     
     def unbind(self, *keys: str) -> "LoggerAdapter":
         """Remove contexto do logger."""
-        for key in keys:
-            self._context.pop(key, None)
         self._logger = self._logger.unbind(*keys)
         return self
-    
-    def debug(self, msg: str, **kwargs: Any) -> None:
-        self._logger.debug(msg, **kwargs)
-    
-    def info(self, msg: str, **kwargs: Any) -> None:
-        self._logger.info(msg, **kwargs)
-    
-    def warning(self, msg: str, **kwargs: Any) -> None:
-        self._logger.warning(msg, **kwargs)
-    
-    def error(self, msg: str, **kwargs: Any) -> None:
-        self._logger.error(msg, **kwargs)
-    
-    def exception(self, msg: str, **kwargs: Any) -> None:
-        self._logger.exception(msg, **kwargs)